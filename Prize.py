@@ -1,16 +1,52 @@
-import pandas as pd
-import numpy as np
-import seaborn as sns
+import base64
+import os
+
 import streamlit as st
-import plotly.express as px
-import datetime as dt
+import assets
+import instrumentation
+from instrumentation import stage
 
 # Set the Page Layout
 st.set_page_config(layout="wide")
 
+# images are served from the local assets folder, warn once per process about
+# missing ones (shown as placeholders)
+@st.cache_resource
+def check_assets():
+    return assets.check()
+
+check_assets()
+
+# the snapshot is built once per process if there is none yet (fresh deploy),
+# so the Introduction can show its years without importing nobel_data
+@st.cache_resource
+def prepare_snapshot():
+    import snapshot
+    if snapshot.read_current() is None:
+        from nobel_data import refresh
+        refresh()
+
+prepare_snapshot()
+
+# Under serve.py (NOBEL_BALANCED=1) each connection goes to the least busy
+# worker, and files of Streamlit's media store (/media/...) only exist in the
+# worker of the session that added them. Media is then inlined or linked.
+BALANCED = os.environ.get("NOBEL_BALANCED") == "1"
+
+def export_button(label,data,file_name):
+    if BALANCED:
+        href = f"data:text/plain;charset=utf-8;base64,{base64.b64encode(data.encode('utf-8')).decode('ascii')}"
+        st.markdown(f'<a href="{href}" download="{file_name}">{label}</a>',unsafe_allow_html=True)
+    else:
+        st.download_button(label,data,file_name=file_name)
+
 # Sidebar Widgets
-st.sidebar.image("https://gbsn.org/wp-content/uploads/2020/07/AUB-logo.png")
-options = st.sidebar.radio("Explore",["Introduction","By Country","By Category","By Age and Gender"],help="Use one of the following radio buttons to explore Nobel Prize Winners")
+st.sidebar.image(assets.data_uri("aub-logo.png"))
+pages = ["Introduction","By Country","By Category","By Age and Gender"]
+# hidden page, only listed when profiling is enabled (NOBEL_PROFILE=1)
+if instrumentation.ENABLED:
+    pages.append("Diagnostics")
+options = st.sidebar.radio("Explore",pages,help="Use one of the following radio buttons to explore Nobel Prize Winners")
 st.sidebar.write("    ")
 st.sidebar.write("Sources:")
 st.sidebar.markdown("""
@@ -20,21 +56,107 @@ st.sidebar.write("Done By:")
 st.sidebar.markdown("> Rafic Srouji")
 
 # get dataset
-@st.cache
-def get_data():
-    # Loading the Data
-    df = pd.read_csv("https://raw.githubusercontent.com/Raf888-sr/DDDM/main/nobel.csv")
-    # Some Manipulations
-    df['usa_born_winner'] = df['birth_country'] == 'United States of America'
-    df['decade'] = (np.floor(df['year']/10)*10).astype(int)
-    df['birth_date'] = pd.to_datetime(df['birth_date'])
-    df = df.dropna(subset=['birth_date'])
-    df['age'] = (df['year'] - df['birth_date'].dt.year).astype(int)
-    return df
-nobel = get_data()
-
-min_year = nobel['year'].min()
-max_year = nobel['year'].max()
+# pandas, numpy and plotly are imported inside these functions, so pages that
+# do not use them (Introduction) never pay for the imports
+
+# version of the local snapshot of nobel.csv, checked on every rerun: when the
+# csv changes the snapshot is refreshed and running sessions switch to it
+def get_version():
+    from nobel_data import refresh
+    return refresh()
+
+# everything below is cached per snapshot version, the previous version is
+# kept until the sessions still showing it have rerun
+# aggregate counts behind the counters and bar charts, stored with the snapshot
+@st.cache_resource(max_entries=2)
+def get_cube(version):
+    from nobel_data import load_cube
+    return load_cube(version=version)
+
+# figures built for earlier widget states, shared by all sessions
+@st.cache_resource(max_entries=2)
+def get_figure_cache(version):
+    from figures import FigureCache
+    return FigureCache(maxsize=256)
+
+# statistics that do not depend on any widget (shares per decade, totals,
+# youngest and oldest laureates), computed when the snapshot is built
+@st.cache_resource(max_entries=2)
+def get_analytics(version):
+    from nobel_data import load_analytics
+    return load_analytics(version=version)
+
+# proportions of USA born winners per decade
+@st.cache_resource(max_entries=2)
+def get_usa_share_figure(version):
+    import pandas as pd
+    import figures
+    prop_usa_winners = pd.DataFrame(get_analytics(version)['usa_share_by_decade']).rename(columns={'share':'usa_born_winner'})
+    return figures.usa_share_line(prop_usa_winners)
+
+# Counter tiles: (key in the counts, label, icon asset), laid out column by column
+CATEGORY_TILES = [
+    ("Chemistry","Chemistry","chemistry.svg"),
+    ("Physics","Physics","physics.svg"),
+    ("Medicine","Medicine","medicine.svg"),
+    ("Peace","Peace","peace.svg"),
+    ("Literature","Literature","literature.svg"),
+    ("Economics","Economics","economics.svg"),
+]
+GENDER_TILES = [
+    ("Female","Females","female.svg"),
+    ("Male","Males","male.svg"),
+]
+
+# Youngest and oldest laureates are read from the data, these are the ones with
+# a portrait and a biography: full_name: (portrait asset, biography html)
+LAUREATE_BIOS = {
+    "Malala Yousafzai": ("malala-yousafzai.jpg", """
+                <p style = "text-align:justify"><strong>Malala Yousafzai</strong>, (born July 12, 1997, Mingora, Swat valley, Pakistan), Pakistani activist who, while a teenager, spoke out publicly against the prohibition on the education of girls that was imposed by the Tehrik-e-Taliban Pakistan (TTP; sometimes called Pakistani Taliban). She gained global attention when she survived an assassination attempt at age 15. In 2014 Yousafzai and Kailash Satyarthi were jointly awarded the Nobel Prize for Peace in recognition of their efforts on behalf of children’s rights.</p>
+                <a href = "https://www.britannica.com/biography/Malala-Yousafzai">Click to read more</a>
+                """),
+    "Leonid Hurwicz": ("leonid-hurwicz.jpg", """
+                <p style = "text-align:justify"><strong>Leonid Hurwicz</strong>, (born Aug. 21, 1917, Moscow, Russia—died June 24, 2008, Minneapolis, Minn., U.S.),
+                 Russian-born American economist who, with Eric S. Maskin and Roger B. Myerson, received a share of the 2007 Nobel Prize for
+                 Economics for his formulation of mechanism design theory, a microeconomic model of resource allocation that attempts to produce
+                  the best outcome for market participants under nonideal conditions.</p>
+                <a href = "https://www.britannica.com/biography/Leonid-Hurwicz">Click to read more</a>
+                """),
+}
+
+LAUREATE_PRIZE = """<p><strong>{full_name}</strong> was {age} when awarded the {year} Nobel Prize in {category}.</p>"""
+
+COUNTER_TILE = """
+<div style="display:flex;align-items:center;margin-bottom:1em;">
+    <img src="{icon}" width=100/>
+    <div style="font-size:50px;padding-left:30px;margin-left:1em;min-width:5.5em;">{label}</div>
+    <div style="font-size:50px;padding-left:30px;">{count}</div>
+</div>"""
+
+def counter_tiles(tiles,counts,columns=None):
+    """Render a grid of icon / label / count tiles with a single st.write call.
+
+    counts is looked up by each tile's key, missing keys count as 0.
+    """
+    columns = columns or len(tiles)
+    rows = -(-len(tiles) // columns)
+    html = "".join(COUNTER_TILE.format(icon=assets.data_uri(icon),label=label,count=counts.get(key,0)) for key,label,icon in tiles)
+    st.write(f"""<div style="display:grid;grid-auto-flow:column;grid-template-rows:repeat({rows},auto);
+                grid-template-columns:repeat({columns},1fr);">{html}</div>""",unsafe_allow_html=True)
+
+# every page but the Introduction shows data and charts, they are loaded on
+# the first rerun that shows one of them
+if options != "Introduction":
+    import figures
+    from figures import figure_key
+    with stage(options,"load"):
+        version = get_version()
+        cube = get_cube(version)
+        figure_cache = get_figure_cache(version)
+        analytics = get_analytics(version)
+
+    min_year = cube.min_year
+    max_year = cube.max_year
 
 
 if options == "Introduction":
@@ -42,59 +164,53 @@ if options == "Introduction":
 
     col1,col2 = st.columns([4,1])
 
+    import snapshot
+    first_year,last_year = snapshot.read_years()
     with col1:
-        st.markdown("""
+        st.markdown(f"""
 
-        <div style="text-align: justify"><p> In this exercise we will dive into the Nobel prize Laureats dataset by the Nobel Prize Foundation. This dataset lists all prize winners from the start of the prize in 1901 till 2016.</p>
+        <div style="text-align: justify"><p> In this exercise we will dive into the Nobel prize Laureats dataset by the Nobel Prize Foundation. This dataset lists all prize winners from the start of the prize in {first_year} till {last_year}.</p>
         <p> The Nobel prize is one of the most famous and prestigious intellectual awards. It is awarded annually for 6 different categories. From Stockholm, the Royal Swedish Academy of Sciences confers the prizes for physics, chemistry, and economics, the Karolinska Institute confers the prize for physiology or medicine, and the Swedish Academy confers the prize for literature. The Norwegian Nobel Committee based in Oslo confers the prize for peace.</p>
 
         <p>A person or organization awarded the Nobel Prize is called a Nobel Laureate. The word "laureate" refers to the laurel wreath (إكليل الغار) that was considered as "a trophy" in ancient greek, given to victors of competitions (image to the right).</p><br></div>
 
         """,unsafe_allow_html=True)
     with col2:
-        st.markdown("""
-        <p><img style="float: right;margin:0.5px 20px 10px 20px; max-width: 200px;height: 220px;display: inline-block" src="http://assets.stickpng.com/images/587516c119ef112e47c6964d.png"></p>""",unsafe_allow_html=True)
+        st.markdown(f"""
+        <p><img style="float: right;margin:0.5px 20px 10px 20px; max-width: 200px;height: 220px;display: inline-block" src="{assets.data_uri('laurel.png')}"></p>""",unsafe_allow_html=True)
 
 
     st.markdown("--------")
 
     st.title("Brief History of Nobel Prize")
-    st.video("https://www.youtube.com/watch?v=c0ou3X9SfB8&ab_channel=NationalGeographic")
+    # played from the local copy when there is one (linked under serve.py, see
+    # BALANCED), never embedded from YouTube
+    if assets.video_path() and not BALANCED:
+        st.video(assets.video_path())
+    else:
+        st.markdown(f"[Watch the National Geographic video on YouTube]({assets.VIDEO_URL})")
 
 
 
 if options == "By Country":
 
     st.title("Nobel Prize Winners By Country of Birth")
-    st.subheader("This page inspects the winners of Nobel Prize based on their country of birth from 1901 until 2016. You can use the slider to filter the range of years.")
+    st.subheader(f"This page inspects the winners of Nobel Prize based on their country of birth from {min_year} until {max_year}. You can use the slider to filter the range of years.")
 
     slider_year = st.slider("Select Time Period",min_year,max_year,value=[min_year,max_year])
 
-    df_selected = nobel[(nobel['year']>=slider_year[0]) & (nobel['year']<=slider_year[1])]
-
-    top_countries = df_selected['birth_country'].value_counts().head(10)
-    country_names = top_countries.index
-
-    df = df_selected.groupby(['birth_country'],as_index=False).size().sort_values(by='size',ascending=False).head(10)
+    with stage(options,"filter"):
+        top_countries = cube.top_countries(slider_year)
 
     col3,col4 = st.columns([2,1])
 
     with col3:
         st.subheader(f"Bar Chart showing top 10 countries of birth of the prize winners from {slider_year[0]} to {slider_year[1]}")
-        # Plotting a Bar Plot
-        fig = px.bar(df,x="size",y="birth_country",orientation='h',color='birth_country',
-                    width=800,height=600)
-
-        # Updating Figure and Axes Layouts
-        fig.update_layout(showlegend=False,xaxis=dict(title="Number of Prizes",showgrid=False),yaxis=dict(showgrid=False),
-                         font = dict(
-                                    family = "Open Sans",
-                                    size = 15
-
-
-                         ))
-        # fig.update_xaxes(title="Number of Prizes")
-        st.write(fig)
+        with stage(options,"bar figure"):
+            fig = figure_cache.get(figure_key("By Country",year=slider_year),
+                                   lambda: figures.country_bar(top_countries.reset_index(name='size')))
+        with stage(options,"render bar"):
+            st.write(fig)
 
     with col4:
         st.subheader("Number of Prizes Per Country")
@@ -103,37 +219,29 @@ if options == "By Country":
         st.write("   ")
         st.write("    ")
         st.write("    ")
-        st.dataframe(top_countries,height=500)
+        with stage(options,"render table"):
+            st.dataframe(top_countries,height=500)
 
-    st.write("""Just looking at the first couple of prize winners, or Nobel laureates as they are also called, we already see a celebrity: Wilhelm Conrad Röntgen, the guy who discovered X-rays. And actually, we see that all of the winners in 1901 were guys that came from Europe.
-     But that was back in 1901, looking at all winners in the dataset, from 1901 to 2016, USA clearly dominates over time.""")
+    st.write(f"""Just looking at the first couple of prize winners, or Nobel laureates as they are also called, we already see a celebrity: Wilhelm Conrad Röntgen, the guy who discovered X-rays. And actually, we see that all of the winners in 1901 were guys that came from Europe.
+     But that was back in 1901, looking at all winners in the dataset, from {min_year} to {max_year}, USA clearly dominates over time.""")
 
     st.markdown("-------")
 
     st.subheader("US Laureats Domination")
-    # proportions of USA born winners per decade
-    prop_usa_winners= nobel.groupby('decade',as_index=False)['usa_born_winner'].mean()
-
-    # Plotting a Line Plot
-    fig2 = px.line(prop_usa_winners,x="decade",y="usa_born_winner",width=1200,height=700)
-    # Updating axes layout
-    fig2.update_layout(yaxis=dict(title="Percentage of US Born Winners",tickformat=".2%",showgrid=False),
-        title="Percentage of US born Nobel Prize winners per decade",
-        xaxis=dict(title="Decade",showgrid=False),
-        font = dict(
-            family = "Open Sans",
-            size = 15
-            ))
-    st.write(fig2)
+    with stage(options,"share figure"):
+        fig2 = get_usa_share_figure(version)
+    with stage(options,"render share"):
+        st.write(fig2)
 
-    st.write("USA began to dominate the Nobel Prize in the 1930s accounting for 25% of the total prizes during this decade. It continued ever since until reaching a new peak during the 2000s.")
+    if analytics['usa_top_since'] is not None:
+        st.write(f"USA began to dominate the Nobel Prize in the {analytics['usa_top_since']}s accounting for {analytics['usa_top_since_share']:.0%} of the total prizes during this decade. It continued ever since until reaching a new peak during the {analytics['usa_peak_decade']}s.")
 
 
 elif options == "By Category":
     st.title("Nobel Prize Winners by Category")
-    st.markdown("""
+    st.markdown(f"""
     <h3 style: "text-align: justify">
-        This page inspects Nobel Prize winners according to the field. Since 1901, the Nobel Prize has been awarded in the fields of physics, chemistry, physiology or medicine, literature and peace,
+        This page inspects Nobel Prize winners according to the field. Since {min_year}, the Nobel Prize has been awarded in the fields of physics, chemistry, physiology or medicine, literature and peace,
          while a memorial prize in economic sciences was added in 1968.</h3>""",unsafe_allow_html=True)
     st.subheader("Use the slider and selectbox to filter by year and category respectively.")
 
@@ -142,215 +250,35 @@ elif options == "By Category":
     with col5:
         year = st.slider("Select Time Period",min_year,max_year,value=[min_year,max_year])
 
-        df_field = nobel[(nobel['year']>=year[0]) & (nobel['year']<=year[1])]
-        # grouped = df_field.groupby('category',as_index=False).size()
+        with stage(options,"filter"):
+            category_counts = cube.category_counts(year)
 
     with col6:
-        selected_field=st.selectbox("Select Category",nobel['category'].unique())
+        selected_field=st.selectbox("Select Category",cube.category_order)
 
     st.subheader("Nobel Prize Winners By Category")
 
-    col7,col8 = st.columns([1,1])
-
-    with col7:
-        # Number of Chemsitry Prizes
-        if 'Chemistry' in df_field['category'].unique():
-            st.write(f"""
-                <div>
-                    <div style="display:inline-block;vertical-align:center;">
-                    <img src="https://www.svgrepo.com/show/58697/chemistry.svg" width=100/>
-                    </div>
-                    <div style="display:inline-block;vertical-align:center;font-size:50px;padding-left: 30px;margin-left:1em";>
-                    Chemistry
-                    </div>
-                    <div style="display:inline-block;vertical-align:center;font-size:50px;padding-left: 30px;margin-left:1em";>
-                    {df_field['category'].value_counts()['Chemistry']}
-                    </div>""", unsafe_allow_html=True)
-        else:
-            st.write(f"""
-                <div>
-                    <div style="display:inline-block;vertical-align:center;">
-                    <img src="https://www.svgrepo.com/show/58697/chemistry.svg" width=100/>
-                    </div>
-                    <div style="display:inline-block;vertical-align:center;font-size:50px;padding-left: 30px;margin-left:1em";>
-                    Chemistry
-                    </div>
-                    <div style="display:inline-block;vertical-align:center;font-size:50px;padding-left: 30px;margin-left:1em";>
-                    0
-                    </div>""", unsafe_allow_html=True)
-        st.write("""
-        """)
-        # Number of Physics Prizes
-        if 'Physics' in df_field['category'].unique():
-            st.write(f"""
-                <div>
-                    <div style="display:inline-block;vertical-align:center;">
-                    <img src="https://www.svgrepo.com/show/108617/physics.svg" width=100/>
-                    </div>
-                    <div style="display:inline-block;vertical-align:center;font-size:50px;padding-left: 30px;margin-left:1em";>
-                    Physics
-                    </div>
-                    <div style="display:inline-block;vertical-align:center;font-size:50px;padding-left: 30px;margin-left:2.1em";>
-                    {df_field['category'].value_counts()['Physics']}
-                    </div>
-                    """,unsafe_allow_html=True)
-        else:
-            st.write(f"""
-                <div>
-                    <div style="display:inline-block;vertical-align:center;">
-                    <img src="https://www.svgrepo.com/show/108617/physics.svg" width=100/>
-                    </div>
-                    <div style="display:inline-block;vertical-align:center;font-size:50px;padding-left: 30px;margin-left:1em";>
-                    Physics
-                    </div>
-                    <div style="display:inline-block;vertical-align:center;font-size:50px;padding-left: 30px;margin-left:2.1em";>
-                    0
-                    </div>
-                    """,unsafe_allow_html=True)
-        st.write("""
-
-        """)
-
-            # Number of Medicine Prizes
-        if 'Medicine' in df_field['category'].unique():
-            st.write(f"""
-                    <div>
-                        <div style="display:inline-block;vertical-align:center;">
-                        <img src="https://www.svgrepo.com/show/22871/medicine.svg" width=100/>
-                        </div>
-                        <div style="display:inline-block;vertical-align:center;font-size:50px;padding-left: 30px;margin-left:1em";>
-                        Medicine
-                        </div>
-                        <div style="display:inline-block;vertical-align:center;font-size:50px;padding-left: 30px;margin-left:1.5em";>
-                        {df_field['category'].value_counts()['Medicine']}
-                        </div>
-                        """,unsafe_allow_html=True)
-        else:
-            st.write(f"""
-                    <div>
-                        <div style="display:inline-block;vertical-align:center;">
-                        <img src="https://www.svgrepo.com/show/22871/medicine.svg" width=100/>
-                        </div>
-                        <div style="display:inline-block;vertical-align:center;font-size:50px;padding-left: 30px;margin-left:1em";>
-                        Medicine
-                        </div>
-                        <div style="display:inline-block;vertical-align:center;font-size:50px;padding-left: 30px;margin-left:1.5em";>
-                        0
-                        </div>
-                        """,unsafe_allow_html=True)
-
-
-    with col8:
-            # Number of Peace Prizes
-            if 'Peace' in df_field['category'].unique():
-                st.write(f"""
-                        <div>
-                            <div style="display:inline-block;vertical-align:center;">
-                            <img src="https://www.svgrepo.com/show/381729/peace.svg" width=100/>
-                            </div>
-                            <div style="display:inline-block;vertical-align:center;font-size:50px;padding-left: 30px;margin-left:1em";>
-                            Peace
-                            </div>
-                            <div style="display:inline-block;vertical-align:center;font-size:50px;padding-left: 30px;margin-left:2.1em";>
-                            {df_field['category'].value_counts()['Medicine']}
-                            </div>
-                            """,unsafe_allow_html=True)
-            else:
-                st.write(f"""
-                        <div>
-                            <div style="display:inline-block;vertical-align:center;">
-                            <img src="https://www.svgrepo.com/show/381729/peace.svg" width=100/>
-                            </div>
-                            <div style="display:inline-block;vertical-align:center;font-size:50px;padding-left: 30px;margin-left:1em";>
-                            Peace
-                            </div>
-                            <div style="display:inline-block;vertical-align:center;font-size:50px;padding-left: 30px;margin-left:2.1em";>
-                            0
-                            </div>
-                            """,unsafe_allow_html=True)
-
-            st.write("""
-            """)
-            # Number of Literature Prizes
-            if 'Literature' in df_field['category'].unique():
-                st.write(f"""
-                        <div>
-                            <div style="display:inline-block;vertical-align:center;">
-                            <img src="https://www.svgrepo.com/show/177930/literature-paper.svg" width=100/>
-                            </div>
-                            <div style="display:inline-block;vertical-align:center;font-size:50px;padding-left: 30px;margin-left:1em";>
-                            Literature
-                            </div>
-                            <div style="display:inline-block;vertical-align:center;font-size:50px;padding-left: 30px;margin-left:0.5em";>
-                            {df_field['category'].value_counts()['Literature']}
-                            </div>
-                            """,unsafe_allow_html=True)
-            else:
-                st.write(f"""
-                        <div>
-                            <div style="display:inline-block;vertical-align:center;">
-                            <img src="https://www.svgrepo.com/show/177930/literature-paper.svg" width=100/>
-                            </div>
-                            <div style="display:inline-block;vertical-align:center;font-size:50px;padding-left: 30px;margin-left:1em";>
-                            Literature
-                            </div>
-                            <div style="display:inline-block;vertical-align:center;font-size:50px;padding-left: 30px;margin-left:0.5em";>
-                            0
-                            </div>
-                            """,unsafe_allow_html=True)
-            st.write("""
-            """)
-            # Number of Economics prizes
-
-            if 'Economics' in df_field['category'].unique():
-                st.write(f"""
-                        <div>
-                            <div style="display:inline-block;vertical-align:center;">
-                            <img src="https://www.svgrepo.com/show/11834/economy.svg" width=100/>
-                            </div>
-                            <div style="display:inline-block;vertical-align:center;font-size:50px;padding-left: 30px;margin-left:1em";>
-                            Economics
-                            </div>
-                            <div style="display:inline-block;vertical-align:center;font-size:50px;padding-left: 30px;margin-left:0.1em";>
-                            {df_field['category'].value_counts()['Economics']}
-                            </div>
-                            """,unsafe_allow_html=True)
-            else:
-                st.write(f"""
-                        <div>
-                            <div style="display:inline-block;vertical-align:center;">
-                            <img src="https://www.svgrepo.com/show/11834/economy.svg" width=100/>
-                            </div>
-                            <div style="display:inline-block;vertical-align:center;font-size:50px;padding-left: 30px;margin-left:1em";>
-                            Economics
-                            </div>
-                            <div style="display:inline-block;vertical-align:center;font-size:50px;padding-left: 30px;margin-left:0.1em";>
-                            0
-                            </div>
-                            """,unsafe_allow_html=True)
+    with stage(options,"render tiles"):
+        counter_tiles(CATEGORY_TILES,category_counts,columns=2)
 
     st.markdown('---------')
 
-    # Filtering based on the user selection
-    field_df = nobel[(nobel['year']>=year[0]) & (nobel['year']<=year[1]) & (nobel['category']==selected_field)]
-
-    field_by_country = field_df.groupby('birth_country',as_index=False).size().sort_values('size',ascending=False).head(10)
-
     st.subheader(f"Number of Winners in {selected_field} by Birth Country")
 
-    fig3 = px.bar(field_by_country,x="birth_country",y="size",template='plotly_white',
-                    color_discrete_sequence=px.colors.qualitative.Set1,width=1500,height=800)
-    fig3.update_layout(xaxis=dict(title="Country"),yaxis=dict(title="Number of Prizes"),
-                        font = dict(family="Open Sans",size=15))
-    st.write(fig3)
+    # Filtering based on the user selection
+    with stage(options,"bar figure"):
+        fig3 = figure_cache.get(figure_key("By Category",year=year,category=selected_field),
+                                lambda: figures.field_country_bar(cube.top_countries(year,selected_field).reset_index(name='size')))
+    with stage(options,"render bar"):
+        st.write(fig3)
 
 # By Age and Gender
 elif options == "By Age and Gender":
 
     st.title("Nobel Prize By Age Group and Gender")
     st.subheader("This page inspects the distribution of the age of Nobel Prize Winners based on their gender. Use the slider and selection box to filter by age and gender respectively.")
-    min_age = nobel['age'].min()
-    max_age = nobel['age'].max()
+    min_age = cube.min_age
+    max_age = cube.max_age
 
 
     col9,col10 = st.columns([1,1])
@@ -361,74 +289,69 @@ elif options == "By Age and Gender":
     with col10:
         gender_selection = st.selectbox("Select Gender:",['Female','Male','Both'])
 
-    age_gender_df = nobel[(nobel['age']>=age_slider[0]) & (nobel['age']<=age_slider[1])]
-
     if gender_selection != "Both":
         st.subheader(f"Age Distribution For {gender_selection} Nobel Prize Winners")
-        age_gender_df = nobel[nobel['sex']==gender_selection]
-        fig4 = px.histogram(age_gender_df,x="age",nbins=20,width=1500,height=600,template='simple_white')
-        fig4.update_layout(yaxis=dict(title="Number of Prizes"),xaxis=dict(title="Age"), font = dict(size=15,family="Open Sans"))
-        st.write(fig4)
+        with stage(options,"histogram figure"):
+            fig4 = figure_cache.get(figure_key("By Age and Gender",age=age_slider,gender=gender_selection),
+                                    lambda: figures.age_histogram(cube.age_histogram(age_slider,sex=gender_selection)))
+        with stage(options,"render histogram"):
+            st.write(fig4)
     else:
         st.subheader("Age Distribution For Female and Male Nobel Prize Winners")
-        fig4 = px.histogram(age_gender_df,x="age",color='sex',nbins=20,width=1500,height=600,template='simple_white')
-        fig4.update_layout(yaxis=dict(title="Number of Prizes"),xaxis=dict(title="Age"), font = dict(size=15,family="Open Sans"))
-        st.write(fig4)
+        with stage(options,"histogram figure"):
+            fig4 = figure_cache.get(figure_key("By Age and Gender",age=age_slider,gender=gender_selection),
+                                    lambda: figures.age_histogram(cube.age_histogram(age_slider),color='sex'))
+        with stage(options,"render histogram"):
+            st.write(fig4)
 
 
     st.markdown('--------')
     st.subheader("Number of Female and Male Nobel Prize Based on Age Range")
-    col11,col12 = st.columns([1,1])
-
-    age_gender_df = nobel[(nobel['age']>=age_slider[0]) & (nobel['age']<=age_slider[1])]
-
-    with col11:
-            st.write(f"""
-                    <div>
-                        <div style="display:inline-block;vertical-align:center;">
-                        <img src="https://www.svgrepo.com/show/327761/female.svg" width=100/>
-                        </div>
-                        <div style="display:inline-block;vertical-align:center;font-size:50px;padding-left: 30px;margin-left:1em";>
-                        Females
-                        </div>
-                        <div style="display:inline-block;vertical-align:center;font-size:50px;padding-left: 30px;margin-left:0.1em";>
-                        {age_gender_df['sex'].value_counts()['Female']}
-                        </div>
-                        """,unsafe_allow_html=True)
-    with col12:
-        st.write(f"""
-                <div>
-                    <div style="display:inline-block;vertical-align:center;">
-                    <img src="https://www.svgrepo.com/show/391004/male.svg" width=100/>
-                    </div>
-                    <div style="display:inline-block;vertical-align:center;font-size:50px;padding-left: 30px;margin-left:1em";>
-                    Males
-                    </div>
-                    <div style="display:inline-block;vertical-align:center;font-size:50px;padding-left: 30px;margin-left:0.1em";>
-                    {age_gender_df['sex'].value_counts()['Male']}
-                    </div>
-                    """,unsafe_allow_html=True)
+
+    with stage(options,"filter"):
+        sex_counts = cube.sex_counts(age_slider)
+    with stage(options,"render tiles"):
+        counter_tiles(GENDER_TILES,sex_counts)
     st.write("    ")
-    st.write("It seems men have strongly dominated this precious award regardless of the age range. Of all 883 Nobel Laureats, only 49 women have won the prize.")
+    st.write(f"It seems men have strongly dominated this precious award regardless of the age range. Of all {analytics['laureates']} Nobel Laureats, only {analytics['by_sex'].get('Female',0)} women have won the prize.")
     st.markdown("-------")
     col13,col14 = st.columns((1,1))
 
-    with col13:
-            with st.expander("Youngest Nobel Laureate"):
-
-                st.write("""
-                <img style ="padding-right: 10px" src="https://cdn.britannica.com/71/179071-050-CF95982C/Malala-Yousafzai-2013.jpg?w=400&h=300&c=crop" align="left" width = 300 height =400>
-                <p style = "text-align:justify"><strong>Malala Yousafzai</strong>, (born July 12, 1997, Mingora, Swat valley, Pakistan), Pakistani activist who, while a teenager, spoke out publicly against the prohibition on the education of girls that was imposed by the Tehrik-e-Taliban Pakistan (TTP; sometimes called Pakistani Taliban). She gained global attention when she survived an assassination attempt at age 15. In 2014 Yousafzai and Kailash Satyarthi were jointly awarded the Nobel Prize for Peace in recognition of their efforts on behalf of children’s rights.</p>
-                <a href = "https://www.britannica.com/biography/Malala-Yousafzai">Click to read more</a>
-                """,unsafe_allow_html=True)
-
-    with col14:
-            with st.expander("Oldest Nobel Laureate"):
-                st.write("""
-                <img style ="padding-right: 10px" src="https://nationalmedals.org/wp-content/uploads/2020/07/Leonid-Hurwicz-1.jpg" align="left" width = 300 height =400>
-                <p style = "text-align:justify"><strong>Leonid Hurwicz</strong>, (born Aug. 21, 1917, Moscow, Russia—died June 24, 2008, Minneapolis, Minn., U.S.),
-                 Russian-born American economist who, with Eric S. Maskin and Roger B. Myerson, received a share of the 2007 Nobel Prize for
-                 Economics for his formulation of mechanism design theory, a microeconomic model of resource allocation that attempts to produce
-                  the best outcome for market participants under nonideal conditions.</p>
-                <a href = "https://www.britannica.com/biography/Leonid-Hurwicz">Click to read more</a>
-                """,unsafe_allow_html=True)
+    for col,title,laureate in [(col13,"Youngest Nobel Laureate",analytics['youngest']),(col14,"Oldest Nobel Laureate",analytics['oldest'])]:
+        with col:
+            with st.expander(title):
+                st.write(LAUREATE_PRIZE.format(**{"full_name":"This laureate",**laureate}),unsafe_allow_html=True)
+                if laureate.get('full_name') in LAUREATE_BIOS:
+                    portrait,bio = LAUREATE_BIOS[laureate['full_name']]
+                    st.write(f"""
+                    <img style ="padding-right: 10px" src="{assets.data_uri(portrait)}" align="left" width = 300 height =400>
+                    {bio}""",unsafe_allow_html=True)
+
+# Diagnostics (hidden unless NOBEL_PROFILE=1)
+elif options == "Diagnostics":
+    import pandas as pd
+    st.title("Diagnostics")
+    st.subheader("Rerun time and allocation peak per page and stage, in seconds and bytes")
+    st.caption("Allocation peaks are traced for the whole process, they include the allocations of sessions rerunning at the same time.")
+    summary = instrumentation.recorder.summary()
+    if summary:
+        st.dataframe(pd.DataFrame(summary).set_index(["page","stage"]))
+    else:
+        st.write("No stage recorded yet, browse the other pages first.")
+
+    st.subheader("Figure cache")
+    st.caption("A hit skips building the figure, the chart is still serialized to JSON on every rerun.")
+    st.json(figure_cache.stats())
+
+    st.subheader("Snapshot")
+    from nobel_data import snapshot_info
+    st.json(snapshot_info(version))
+
+    col15,col16,col17 = st.columns(3)
+    with col15:
+        export_button("Export JSON lines",instrumentation.recorder.to_jsonl(),"nobel_stages.jsonl")
+    with col16:
+        export_button("Export Prometheus text",instrumentation.recorder.to_prometheus(),"nobel_stages.prom")
+    with col17:
+        if st.button("Reset"):
+            instrumentation.recorder.clear()
@@ -0,0 +1,153 @@
+"""Local copies of the images shown by the dashboard.
+
+The images are fetched once at build time, resized to twice their displayed
+size and recompressed:
+
+    python assets.py fetch
+
+The app then reads them from ASSETS_DIR and inlines them as data URIs, so
+browsers never contact the third-party hosts and the app works offline.
+An image that has not been fetched is replaced by a blank placeholder of
+its displayed size, still inlined, and a warning is logged at startup.
+serve.py refuses to start while one is missing (see check()).
+
+The Introduction video is hosted on YouTube, which serves no file to
+fetch. Copy a local copy to ASSETS_DIR/VIDEO to play it from there,
+otherwise the page links to it instead of embedding the remote player.
+"""
+import base64
+import functools
+import io
+import logging
+import mimetypes
+import os
+import sys
+import urllib.request
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ASSETS_DIR = os.path.join(BASE_DIR, "assets")
+
+# name: (source url, displayed width, displayed height), sizes in css pixels
+ASSETS = {
+    "aub-logo.png": ("https://gbsn.org/wp-content/uploads/2020/07/AUB-logo.png", 300, None),
+    "laurel.png": ("http://assets.stickpng.com/images/587516c119ef112e47c6964d.png", 200, 220),
+    "chemistry.svg": ("https://www.svgrepo.com/show/58697/chemistry.svg", 100, 100),
+    "physics.svg": ("https://www.svgrepo.com/show/108617/physics.svg", 100, 100),
+    "medicine.svg": ("https://www.svgrepo.com/show/22871/medicine.svg", 100, 100),
+    "peace.svg": ("https://www.svgrepo.com/show/381729/peace.svg", 100, 100),
+    "literature.svg": ("https://www.svgrepo.com/show/177930/literature-paper.svg", 100, 100),
+    "economics.svg": ("https://www.svgrepo.com/show/11834/economy.svg", 100, 100),
+    "female.svg": ("https://www.svgrepo.com/show/327761/female.svg", 100, 100),
+    "male.svg": ("https://www.svgrepo.com/show/391004/male.svg", 100, 100),
+    "malala-yousafzai.jpg": ("https://cdn.britannica.com/71/179071-050-CF95982C/Malala-Yousafzai-2013.jpg?w=400&h=300&c=crop", 300, 400),
+    "leonid-hurwicz.jpg": ("https://nationalmedals.org/wp-content/uploads/2020/07/Leonid-Hurwicz-1.jpg", 300, 400),
+}
+
+# optional, never fetched: name of the local copy and the page it comes from
+VIDEO = "nobel-prize-history.mp4"
+VIDEO_URL = "https://www.youtube.com/watch?v=c0ou3X9SfB8&ab_channel=NationalGeographic"
+
+PLACEHOLDER = ('<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}">'
+               '<rect width="100%" height="100%" fill="#eeeeee"/></svg>')
+
+logger = logging.getLogger(__name__)
+
+
+def asset_path(name):
+    return os.path.join(ASSETS_DIR, name)
+
+
+def missing():
+    """Names of the assets that have not been fetched yet."""
+    return [name for name in ASSETS if not os.path.exists(asset_path(name))]
+
+
+@functools.lru_cache(maxsize=None)
+def data_uri(name):
+    """The asset inlined as a data URI, encoded once per process.
+
+    A missing asset gives a placeholder of its displayed size instead.
+    """
+    path = asset_path(name)
+    if not os.path.exists(path):
+        _, width, height = ASSETS[name]
+        svg = PLACEHOLDER.format(width=width, height=height or width)
+        return f"data:image/svg+xml;base64,{base64.b64encode(svg.encode('ascii')).decode('ascii')}"
+    mime = mimetypes.guess_type(path)[0]
+    with open(path, "rb") as f:
+        return f"data:{mime};base64,{base64.b64encode(f.read()).decode('ascii')}"
+
+
+def video_path():
+    """Path of the local copy of the Introduction video, None if there is none."""
+    path = asset_path(VIDEO)
+    return path if os.path.exists(path) else None
+
+
+def check(strict=False):
+    """Report the images that are missing, called once at startup.
+
+    Logs a warning (the app shows placeholders), or with strict raises
+    FileNotFoundError. Returns the missing names.
+    """
+    names = missing()
+    if names:
+        message = (f"{len(names)} dashboard assets are missing from {ASSETS_DIR}: {', '.join(names)}. "
+                   "Run `python assets.py fetch` to vendor them.")
+        if strict:
+            raise FileNotFoundError(message)
+        logger.warning("%s Placeholders are shown instead.", message)
+    return names
+
+
+def optimize(name, data):
+    """Resize a raster image to twice its displayed size and recompress it.
+
+    SVGs are vector images and are kept as they are.
+    """
+    if name.endswith(".svg"):
+        return data
+    from PIL import Image
+
+    _, width, height = ASSETS[name]
+    image = Image.open(io.BytesIO(data))
+    image.thumbnail((2 * width, 2 * (height or width * image.height // image.width)))
+    out = io.BytesIO()
+    if name.endswith(".jpg"):
+        image.convert("RGB").save(out, "JPEG", quality=85, optimize=True, progressive=True)
+    else:
+        image.save(out, "PNG", optimize=True)
+    return out.getvalue()
+
+
+def fetch(force=False):
+    """Download, optimize and store every missing asset (all of them if force).
+
+    Returns the names that could not be fetched.
+    """
+    os.makedirs(ASSETS_DIR, exist_ok=True)
+    failed = []
+    for name, (url, _, _) in ASSETS.items():
+        if os.path.exists(asset_path(name)) and not force:
+            continue
+        request = urllib.request.Request(url, headers={"User-Agent": "Mozilla/5.0"})
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                raw = response.read()
+        except OSError as e:
+            print(f"{name}: failed ({e})")
+            failed.append(name)
+            continue
+        data = optimize(name, raw)
+        # written under a temporary name first, so a partial file is never used
+        with open(asset_path(name) + ".tmp", "wb") as f:
+            f.write(data)
+        os.replace(asset_path(name) + ".tmp", asset_path(name))
+        print(f"{name}: {len(raw)} -> {len(data)} bytes")
+    return failed
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] != ["fetch"]:
+        sys.exit("usage: python assets.py fetch [--force]")
+    sys.exit(1 if fetch(force="--force" in sys.argv[2:]) else 0)
@@ -0,0 +1,115 @@
+"""Headless benchmark of Prize.py: every page and widget, one JSON line per rerun.
+
+Drives the app with Streamlit's AppTest, no browser or server needed. The
+"Explore" radio goes through every page, and the year/age sliders and the
+category/gender selectboxes go through representative and adversarial
+ranges (full range, single year or age, both ends, empty results). Each
+rerun's latency and traced allocation peak is written to a JSON lines file,
+together with the library versions and the dataset checksum, so runs can
+be compared when the data or the pandas/Plotly/Streamlit versions change.
+
+The dataset is read from the bundled nobel.csv, so this runs offline.
+
+    python benchmarks/bench_app.py [--output bench_app.jsonl] [--repeat 3]
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+import plotly  # noqa: E402
+import streamlit  # noqa: E402
+from streamlit.testing.v1 import AppTest  # noqa: E402
+import nobel_data  # noqa: E402
+
+
+def year_ranges(lo, hi):
+    mid = (lo + hi) // 2
+    return [(lo, hi), (lo, lo), (hi, hi), (lo, mid), (mid, hi), (1950, 1980), (1968, 1968), (2000, hi)]
+
+
+def age_ranges(lo, hi):
+    mid = (lo + hi) // 2
+    return [(lo, hi), (lo, lo), (hi, hi), (lo, mid), (mid, hi), (30, 50), (lo, lo + 1), (hi - 1, hi)]
+
+
+def scenarios(nobel):
+    """(page, [(widget kind, index, value), ...]) for every combination to time."""
+    min_year, max_year = int(nobel['year'].min()), int(nobel['year'].max())
+    min_age, max_age = int(nobel['age'].min()), int(nobel['age'].max())
+    yield "Introduction", []
+    for years in year_ranges(min_year, max_year):
+        yield "By Country", [("slider", 0, years)]
+    for years in year_ranges(min_year, max_year):
+        for category in nobel['category'].cat.categories:
+            yield "By Category", [("slider", 0, years), ("selectbox", 0, category)]
+    for ages in age_ranges(min_age, max_age):
+        for gender in ["Female", "Male", "Both"]:
+            yield "By Age and Gender", [("slider", 0, ages), ("selectbox", 0, gender)]
+
+
+def rerun(at, action):
+    tracemalloc.reset_peak()
+    before = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    action()
+    latency = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] - before
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    return latency, peak
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--output", default="bench_app.jsonl")
+    parser.add_argument("--repeat", type=int, default=3, help="times each widget state is rerun")
+    args = parser.parse_args()
+
+    nobel = nobel_data.load_nobel()
+    environment = {
+        "python": platform.python_version(), "numpy": np.__version__, "pandas": pd.__version__,
+        "plotly": plotly.__version__, "streamlit": streamlit.__version__,
+        "dataset_sha256": nobel_data.file_checksum(nobel_data.DATA_PATH), "rows": len(nobel),
+    }
+
+    tracemalloc.start()
+    at = AppTest.from_file(os.path.join(ROOT, "Prize.py"), default_timeout=120)
+    latency, peak = rerun(at, at.run)
+    records = [{"page": "Introduction", "state": {}, "run": "cold start", "latency_s": latency, "peak_bytes": peak}]
+
+    for page, widgets in scenarios(nobel):
+        if at.sidebar.radio[0].value != page:
+            # the page's widgets only exist after the switch has been rerun
+            latency, peak = rerun(at, at.sidebar.radio[0].set_value(page).run)
+            records.append({"page": page, "state": {}, "run": "page switch", "latency_s": latency, "peak_bytes": peak})
+        for kind, index, value in widgets:
+            getattr(at, kind)[index].set_value(list(value) if isinstance(value, tuple) else value)
+        state = {f"{kind}{index}": value for kind, index, value in widgets}
+        for i in range(args.repeat):
+            latency, peak = rerun(at, at.run)
+            records.append({"page": page, "state": state, "run": "first" if i == 0 else "repeat",
+                            "latency_s": latency, "peak_bytes": peak})
+    tracemalloc.stop()
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps({**environment, **record}) + "\n")
+
+    df = pd.DataFrame(records[1:])
+    summary = df.groupby(["page", "run"])["latency_s"].describe(percentiles=[0.5, 0.95])[["count", "50%", "95%", "max"]]
+    summary["peak MiB"] = df.groupby(["page", "run"])["peak_bytes"].max() / 2**20
+    print(f"cold start {records[0]['latency_s']:.3f} s, {len(records)} reruns written to {args.output}")
+    print(summary.to_string(float_format=lambda v: f"{v:.4f}"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Per-interaction latency of the page aggregations: raw frame scans vs NobelCube.
+
+The dataset is replicated up to 1000x. One "interaction" computes what a
+slider move needs on the By Country, By Category and By Age and Gender
+pages: top 10 countries, category counters, top 10 countries for one
+category and the gender counters.
+
+    python benchmarks/bench_cube.py
+"""
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pandas as pd  # noqa: E402
+from nobel_data import NobelCube, load_nobel  # noqa: E402
+
+REPLICAS = [1, 10, 100, 1000]
+INTERACTIONS = 50
+
+
+def scan(nobel, year, age, category):
+    df_selected = nobel[(nobel['year'] >= year[0]) & (nobel['year'] <= year[1])]
+    df_selected['birth_country'].value_counts().head(10)
+    df_selected['category'].value_counts()
+    field_df = df_selected[df_selected['category'] == category]
+    field_df.groupby('birth_country', observed=True).size().sort_values(ascending=False).head(10)
+    nobel[(nobel['age'] >= age[0]) & (nobel['age'] <= age[1])]['sex'].value_counts()
+
+
+def lookup(cube, year, age, category):
+    cube.top_countries(year)
+    cube.category_counts(year)
+    cube.top_countries(year, category)
+    cube.sex_counts(age)
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    base = load_nobel()
+    rng = random.Random(0)
+    states = []
+    for _ in range(INTERACTIONS):
+        year = sorted(rng.sample(range(base['year'].min(), base['year'].max() + 1), 2))
+        age = sorted(rng.sample(range(base['age'].min(), base['age'].max() + 1), 2))
+        states.append((year, age, rng.choice(list(base['category'].cat.categories))))
+
+    print(f"{'rows':>10} {'scan ms':>10} {'cube ms':>10} {'cube build s':>13}")
+    for replicas in REPLICAS:
+        nobel = pd.concat([base] * replicas, ignore_index=True)
+        start = time.perf_counter()
+        cube = NobelCube(nobel)
+        build = time.perf_counter() - start
+        scan_ms = sum(timed(scan, nobel, *s) for s in states) / len(states) * 1000
+        cube_ms = sum(timed(lookup, cube, *s) for s in states) / len(states) * 1000
+        print(f"{len(nobel):>10} {scan_ms:>10.3f} {cube_ms:>10.3f} {build:>13.3f}")
+
+
+if __name__ == "__main__":
+    main()
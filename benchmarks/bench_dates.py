@@ -0,0 +1,89 @@
+"""Throughput of the birth date stage: parse_dates() vs pd.to_datetime without a format.
+
+A column of date strings like nobel.csv's birth_date is generated in
+memory, with a share of partial (YYYY-00-00), malformed and missing
+values. It is parsed the old way, pd.to_datetime with the format inferred
+(errors='coerce', since it raises on malformed values and the partial
+dates are lost), and with nobel_data.parse_dates(). pandas infers the
+format from the first value, so the old way is also timed with a partial
+date first, when it falls back to parsing each value on its own. The
+counts and years returned by parse_dates() are checked against the
+generated ones.
+
+    python benchmarks/bench_dates.py [--rows 10000000] [--repeat 3]
+"""
+import argparse
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from nobel_data import parse_dates  # noqa: E402
+
+
+def make_dates(n, rng, partial, malformed, missing):
+    dates = (np.datetime64('1817-01-01') + rng.integers(0, 65_000, n)).astype('U10')
+    years = dates.astype('U4').astype(float)
+    kind = rng.random(n)
+    is_partial = kind < partial
+    is_malformed = (kind >= partial) & (kind < partial + malformed)
+    is_missing = (kind >= partial + malformed) & (kind < partial + malformed + missing)
+    dates[is_partial] = np.strings.add(dates[is_partial].astype('U4'), '-00-00')
+    dates[is_malformed] = 'unknown'
+    years[is_malformed | is_missing] = np.nan
+    values = pd.Series(dates, dtype='str')
+    values[is_missing] = None
+    counts = {"complete": int(n - is_partial.sum() - is_malformed.sum() - is_missing.sum()),
+              "partial": int(is_partial.sum()), "missing": int(is_missing.sum()),
+              "malformed": int(is_malformed.sum())}
+    return values, years, counts
+
+
+def best(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--partial", type=float, default=0.002)
+    parser.add_argument("--malformed", type=float, default=0.002)
+    parser.add_argument("--missing", type=float, default=0.03)
+    args = parser.parse_args()
+
+    values, years, counts = make_dates(args.rows, np.random.default_rng(0), args.partial, args.malformed, args.missing)
+
+    inferred_s, inferred = best(lambda: pd.to_datetime(values, errors='coerce'), args.repeat)
+    partial_first = values.copy()
+    partial_first.iloc[0] = '1917-00-00'
+    with warnings.catch_warnings():
+        # "Could not infer format, so each element will be parsed individually"
+        warnings.simplefilter("ignore", UserWarning)
+        fallback_s, fallback = best(lambda: pd.to_datetime(partial_first, errors='coerce'), args.repeat)
+    parsed_s, (dates, parsed_years, parsed_counts) = best(lambda: parse_dates(values), args.repeat)
+
+    assert parsed_counts == counts, (parsed_counts, counts)
+    assert np.array_equal(parsed_years, years, equal_nan=True)
+    assert dates.equals(inferred), "complete dates differ from the inferred parse"
+
+    print(f"{args.rows} rows: {counts}")
+    print(f"{'method':>26} {'s':>8} {'rows/s':>12} {'rows kept':>10}")
+    print(f"{'to_datetime (inferred)':>26} {inferred_s:>8.3f} {args.rows / inferred_s:>12.0f} {int(inferred.notna().sum()):>10}")
+    print(f"{'to_datetime (partial 1st)':>26} {fallback_s:>8.3f} {args.rows / fallback_s:>12.0f} {int(fallback.notna().sum()):>10}")
+    print(f"{'parse_dates':>26} {parsed_s:>8.3f} {args.rows / parsed_s:>12.0f} {int(np.isfinite(parsed_years).sum()):>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Age histogram payload: px.histogram over rows vs bins from NobelCube.
+
+Reports the size of the figure JSON that is sent to the browser and the
+time to build and serialize it, with the dataset replicated up to 1000x.
+
+    python benchmarks/bench_histogram.py
+"""
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pandas as pd  # noqa: E402
+import plotly.express as px  # noqa: E402
+import figures  # noqa: E402
+from nobel_data import NobelCube, load_nobel  # noqa: E402
+
+REPLICAS = [1, 10, 100, 1000]
+
+
+def rows_histogram(nobel):
+    fig = px.histogram(nobel, x="age", color='sex', nbins=20, width=1500, height=600, template='simple_white')
+    return fig.to_json()
+
+
+def binned_histogram(cube):
+    fig = figures.age_histogram(cube.age_histogram((cube.min_age, cube.max_age)), color='sex')
+    return fig.to_json()
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    payload = fn(*args)
+    return time.perf_counter() - start, len(payload)
+
+
+def main():
+    base = load_nobel()
+    print(f"{'rows':>10} {'rows KiB':>10} {'rows ms':>10} {'binned KiB':>11} {'binned ms':>10}")
+    for replicas in REPLICAS:
+        nobel = pd.concat([base] * replicas, ignore_index=True)
+        cube = NobelCube(nobel)
+        rows_time, rows_size = timed(rows_histogram, nobel)
+        binned_time, binned_size = timed(binned_histogram, cube)
+        print(f"{len(nobel):>10} {rows_size / 1024:>10.1f} {rows_time * 1000:>10.1f} "
+              f"{binned_size / 1024:>11.1f} {binned_time * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Import cost of each page of Prize.py, measured with python -X importtime.
+
+For every page a fresh interpreter runs the app headless (AppTest), opens
+the page and reports the imports made while the script ran (the imports of
+Streamlit and AppTest themselves are excluded). The snapshot is built
+first, as on a deployed app. The Introduction page must not import pandas,
+plotly.express or seaborn.
+
+    python benchmarks/bench_importtime.py
+"""
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGES = ["Introduction", "By Country", "By Category", "By Age and Gender"]
+HEAVY = ["pandas", "numpy", "plotly.express", "seaborn", "nobel_data", "figures"]
+MARKER = "--- app starts ---"
+
+CHILD = """
+import sys
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({app!r}, default_timeout=120)
+print({marker!r}, file=sys.stderr, flush=True)
+at.run()
+if {page!r} != "Introduction":
+    at.sidebar.radio[0].set_value({page!r}).run()
+assert not at.exception, at.exception
+"""
+
+
+def imports_during_run(page):
+    code = CHILD.format(app=os.path.join(ROOT, "Prize.py"), marker=MARKER, page=page)
+    stderr = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                            check=True, capture_output=True, text=True).stderr
+    lines = stderr.split(MARKER, 1)[1].splitlines()
+    imports, top_level = {}, 0
+    for line in lines:
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit():
+            imports[name.strip()] = int(cumulative)
+            # nested imports are indented, only top-level cumulative times add up
+            if not name[1:].startswith(" "):
+                top_level += int(cumulative)
+    return imports, top_level
+
+
+def main():
+    sys.path.insert(0, ROOT)
+    import nobel_data
+    nobel_data.refresh()
+
+    print(f"{'page':>18} {'modules':>8} {'top-level ms':>13}  heavy modules (cumulative ms)")
+    for page in PAGES:
+        imports, total = imports_during_run(page)
+        heavy = ", ".join(f"{name} {imports[name] / 1000:.0f}" for name in HEAVY if name in imports)
+        print(f"{page:>18} {len(imports):>8} {total / 1000:>13.1f}  {heavy or '-'}")
+        if page == "Introduction":
+            loaded = [name for name in ("pandas", "plotly.express", "seaborn") if name in imports]
+            assert not loaded, f"Introduction imports {loaded}"
+
+
+if __name__ == "__main__":
+    main()
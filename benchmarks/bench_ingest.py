@@ -0,0 +1,56 @@
+"""Peak memory and throughput of read_raw() vs the chunked read_chunked().
+
+Each reader runs in a fresh interpreter and reports rows/s and peak RSS.
+Generate the input with make_synthetic.py first.
+
+    python benchmarks/make_synthetic.py /tmp/synthetic.csv --rows 10000000
+    python benchmarks/bench_ingest.py /tmp/synthetic.csv [--chunksize 500000] [--skip-raw]
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = """
+import resource, sys, time
+sys.path.insert(0, {root!r})
+import nobel_data
+
+start = time.perf_counter()
+if {method!r} == "raw":
+    df = nobel_data.read_raw({path!r})
+else:
+    df = nobel_data.read_chunked({path!r}, chunksize={chunksize})
+elapsed = time.perf_counter() - start
+print(len(df), elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+      df.memory_usage(deep=True).sum())
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("path")
+    parser.add_argument("--chunksize", type=int, default=500_000)
+    parser.add_argument("--skip-raw", action="store_true", help="skip read_raw() on inputs that do not fit in memory")
+    args = parser.parse_args()
+
+    methods = ["chunked"] if args.skip_raw else ["raw", "chunked"]
+    print(f"{'method':>8} {'rows':>10} {'s':>8} {'rows/s':>12} {'peak MiB':>10} {'frame MiB':>10}")
+    for method in methods:
+        code = CHILD.format(root=ROOT, method=method, path=os.path.abspath(args.path), chunksize=args.chunksize)
+        proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+        if proc.returncode:
+            # e.g. read_raw() running out of memory on inputs too large for it
+            error = [line for line in proc.stderr.splitlines() if "Error" in line][-1]
+            print(f"{method:>8} failed: {error}")
+            continue
+        out = proc.stdout.split()
+        rows, elapsed, peak, frame = int(out[0]), float(out[1]), int(out[2]), int(out[3])
+        print(f"{method:>8} {rows:>10} {elapsed:>8.2f} {rows / elapsed:>12.0f} "
+              f"{peak / 2**20:>10.1f} {frame / 2**20:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Overhead of the stage() timers, disabled and enabled.
+
+Times an empty stage against an empty function, and a page rerun's worth
+of stages against the cheapest real rerun work (a cube lookup). With
+profiling disabled a stage must cost well under a microsecond.
+
+    python benchmarks/bench_instrumentation.py
+"""
+import os
+import sys
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import instrumentation  # noqa: E402
+from instrumentation import stage  # noqa: E402
+from nobel_data import NobelCube, load_nobel  # noqa: E402
+
+NUMBER = 20_000
+
+
+def best(fn):
+    return min(timeit.repeat(fn, number=NUMBER, repeat=7)) / NUMBER
+
+
+def main():
+    cube = NobelCube(load_nobel())
+
+    def empty():
+        pass
+
+    def empty_stage():
+        with stage("By Age and Gender", "filter"):
+            pass
+
+    def lookup():
+        cube.sex_counts((30, 60))
+
+    instrumentation.disable()
+    base = best(empty)
+    disabled = best(empty_stage) - base
+    instrumentation.enable()
+    enabled = best(empty_stage) - base
+    instrumentation.disable()
+    work = best(lookup)
+
+    print(f"stage overhead disabled {disabled * 1e9:8.0f} ns")
+    print(f"stage overhead enabled  {enabled * 1e9:8.0f} ns")
+    print(f"cube lookup             {work * 1e9:8.0f} ns "
+          f"(disabled stages add {disabled / work:.2%})")
+    assert disabled < 1e-6, "disabled instrumentation costs more than 1 us per stage"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""Memory of the compact snapshot frame vs the old get_data() frame.
+
+Reports the deep memory usage of both frames per column. tests/test_cube.py
+checks that the counters and chart inputs computed from the compact frame
+match the ones of the full frame.
+
+    python benchmarks/bench_memory.py
+"""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from nobel_data import load_nobel, read_raw  # noqa: E402
+
+
+def report(raw, compact):
+    raw_usage = raw.memory_usage(deep=True, index=False)
+    compact_usage = compact.memory_usage(deep=True, index=False)
+    print(f"{'column':>22} {'old bytes':>12} {'new bytes':>12}  dtype")
+    for name in raw.columns:
+        new = compact_usage.get(name)
+        dtype = compact[name].dtype if name in compact else "(lazy)"
+        print(f"{name:>22} {raw_usage[name]:>12} {'-' if new is None else new:>12}  {dtype}")
+    print(f"{'total':>22} {raw_usage.sum():>12} {compact_usage.sum():>12}  "
+          f"saved {raw_usage.sum() - compact_usage.sum()} bytes "
+          f"({raw_usage.sum() / compact_usage.sum():.1f}x smaller)")
+
+
+def main():
+    raw = read_raw().reset_index(drop=True)
+    compact = load_nobel()
+    report(raw, compact)
+
+
+if __name__ == "__main__":
+    main()
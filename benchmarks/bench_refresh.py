@@ -0,0 +1,50 @@
+"""Time of an incremental refresh vs a full build of the snapshot.
+
+nobel.csv is split by prize year: the early years are written to a
+temporary csv and built, then the later years are appended in batches and
+each refresh is timed. The final csv is then built from scratch. Both
+readers (read_raw and read_chunked) are timed. tests/test_refresh.py
+checks that both builds give the same snapshot.
+
+    python benchmarks/bench_refresh.py
+"""
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import nobel_data  # noqa: E402
+
+BATCHES = [(1901, 2010), (2011, 2013), (2014, 2016)]
+
+
+def build(path, snapshot_dir, chunksize):
+    start = time.perf_counter()
+    version = nobel_data.refresh(path, snapshot_dir, chunksize)
+    seconds = time.perf_counter() - start
+    return nobel_data.read_meta(os.path.join(snapshot_dir, version))["build"], seconds
+
+
+def main():
+    nobel = pd.read_csv(nobel_data.DATA_PATH)
+    print(f"{'reader':>18} {'batch':>10} {'build':>7} {'ms':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for chunksize in (None, 100):
+            label = "read_raw" if chunksize is None else f"read_chunked({chunksize})"
+            path = os.path.join(tmp, f"{label}.csv")
+            for i, (first, last) in enumerate(BATCHES):
+                nobel[nobel['year'].between(first, last)].to_csv(path, mode="w" if i == 0 else "a",
+                                                                  header=i == 0, index=False)
+                kind, seconds = build(path, os.path.join(tmp, f"{label}-incremental"), chunksize)
+                print(f"{label:>18} {f'{first}-{last}':>10} {kind:>7} {seconds * 1000:>8.1f}")
+            kind, seconds = build(path, os.path.join(tmp, f"{label}-full"), chunksize)
+            print(f"{label:>18} {'all':>10} {kind:>7} {seconds * 1000:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
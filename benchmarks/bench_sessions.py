@@ -0,0 +1,149 @@
+"""Checks that the dataset is shared, not copied, as sessions are added.
+
+Starts Prize.py with `streamlit run` and opens 1 to 200 sessions on its
+websocket, the new ones concurrently like browsers connecting together.
+Each session switches to the "By Country" page and reruns once with the
+same widget state. After each step the server's memory is read from
+/proc and the script checks that:
+
+* each extra session adds less than MAX_PER_SESSION to the server's RSS,
+  where a private copy of the cube per session would add its whole size,
+* every array of the cube is mapped from the snapshot's cube files exactly
+  once, so all sessions read the same pages of the page cache.
+
+AppTest is not thread-safe, so it cannot drive concurrent sessions. It is
+then used in-process, one session after another, with the cube's
+top_countries() wrapped to record the cube each rerun gets. The check is
+that the cube is loaded once and every rerun gets that same object, whose
+arrays are read-only memory maps of the snapshot's files.
+
+    python benchmarks/bench_sessions.py [--port 8598]
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+
+import numpy as np
+import websockets
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import nobel_data  # noqa: E402
+from load_test import rerun, wait_for_port  # noqa: E402
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+SESSIONS = [1, 10, 50, 100, 200]
+APPTEST_SESSIONS = 10
+MAX_PER_SESSION = 1 << 20
+
+
+def rss(pid):
+    with open(f"/proc/{pid}/statm") as f:
+        return int(f.read().split()[1]) * 4096
+
+
+def cube_files():
+    version = nobel_data.read_current(nobel_data.SNAPSHOT_DIR)["name"]
+    return {name: os.path.join(nobel_data.SNAPSHOT_DIR, version, "cube", f"{name}.npy")
+            for name in nobel_data.NobelCube._ARRAYS}
+
+
+def mappings(pid, path):
+    with open(f"/proc/{pid}/maps") as f:
+        return sum(line.rstrip("\n").endswith(path) for line in f)
+
+
+async def open_session(url):
+    ws = await websockets.connect(url, subprotocols=["streamlit"], max_size=None)
+    radio_id = await rerun(ws)
+    await rerun(ws, radio_id, "By Country")
+    # rerun with the same widget state, like a widget interaction would
+    await rerun(ws, radio_id, "By Country")
+    return ws
+
+
+async def serve_sessions(pid, port):
+    url = f"ws://127.0.0.1:{port}/_stcore/stream"
+    files = cube_files()
+    sessions = []
+    baseline = None
+    try:
+        for target in SESSIONS:
+            sessions.extend(await asyncio.gather(*(open_session(url) for _ in range(target - len(sessions)))))
+            current = rss(pid)
+            if baseline is None:
+                baseline = current
+                cube_bytes = sum(os.path.getsize(path) for path in files.values())
+                print(f"cube files: {cube_bytes / 2**10:.1f} KiB")
+            per_session = (current - baseline) / max(len(sessions) - 1, 1)
+            print(f"{len(sessions):4d} sessions: rss {current / 2**20:8.2f} MiB   "
+                  f"+{per_session / 2**10:8.1f} KiB per extra session")
+            assert per_session < MAX_PER_SESSION, f"{per_session / 2**10:.1f} KiB per session"
+            for name, path in files.items():
+                assert mappings(pid, path) == 1, f"cube {name} is mapped {mappings(pid, path)} times"
+    finally:
+        await asyncio.gather(*(ws.close() for ws in sessions))
+    print(f"{len(sessions)} concurrent sessions share one mapping of each cube file")
+
+
+def check_reruns():
+    loaded = []
+    load_cube = nobel_data.load_cube
+
+    def recording_load(*args, **kwargs):
+        loaded.append(load_cube(*args, **kwargs))
+        return loaded[-1]
+
+    nobel_data.load_cube = recording_load
+
+    used = []
+    top_countries = nobel_data.NobelCube.top_countries
+
+    def recording_top_countries(cube, *args, **kwargs):
+        used.append(cube)
+        return top_countries(cube, *args, **kwargs)
+
+    nobel_data.NobelCube.top_countries = recording_top_countries
+
+    for _ in range(APPTEST_SESSIONS):
+        at = AppTest.from_file(os.path.join(ROOT, "Prize.py"), default_timeout=60).run()
+        at.sidebar.radio[0].set_value("By Country").run()
+        at.run()
+        assert not at.exception, at.exception
+
+    assert len(loaded) == 1, f"cube was loaded {len(loaded)} times"
+    cube = loaded[0]
+    assert len(used) == 2 * APPTEST_SESSIONS, f"{len(used)} reruns recorded"
+    assert all(c is cube for c in used), "a rerun got a cube other than the shared one"
+    for name, path in cube_files().items():
+        array = getattr(cube, name)
+        assert isinstance(array, np.memmap) and not array.flags.writeable, f"cube {name} is not a read-only map"
+        assert os.path.samefile(array.filename, path), f"cube {name} maps {array.filename}"
+        assert all(np.shares_memory(getattr(c, name), array) for c in used), f"a rerun copied cube {name}"
+    print(f"{len(used)} reruns of {APPTEST_SESSIONS} sessions got the same memory-mapped cube")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8598)
+    args = parser.parse_args()
+
+    nobel_data.refresh()
+    server = subprocess.Popen([sys.executable, "-m", "streamlit", "run", os.path.join(ROOT, "Prize.py"),
+                               "--server.port", str(args.port), "--server.address", "127.0.0.1",
+                               "--server.headless", "true", "--browser.gatherUsageStats", "false"],
+                              cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_for_port(args.port)
+        asyncio.run(serve_sessions(server.pid, args.port))
+    finally:
+        server.terminate()
+        server.wait()
+    check_reruns()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Cold start benchmark: csv + to_datetime path vs the local snapshot.
+
+Each run happens in a fresh interpreter so nothing is cached between runs.
+Reports the load time and how much the process RSS grew while loading.
+The csv path is the body of the original get_data() of Prize.py, kept here
+as it was (reading the bundled nobel.csv instead of downloading it), so the
+reference does not change with nobel_data.read_raw().
+
+On nobel.csv the snapshot loads 2.5-3x faster and adds about half the RSS
+(e.g. 24 ms -> 7 ms and +15.7 MiB -> +7.6 MiB on a 1 core box), short of
+the order of magnitude that was the target.
+
+    python benchmarks/bench_startup.py [--runs 5]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = """
+import sys, time
+sys.path.insert(0, {root!r})
+import numpy as np, pandas as pd
+import nobel_data
+
+def rss():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * 4096
+
+def get_data():
+    # Loading the Data
+    df = pd.read_csv(nobel_data.DATA_PATH)
+    # Some Manipulations
+    df['usa_born_winner'] = df['birth_country'] == 'United States of America'
+    df['decade'] = (np.floor(df['year']/10)*10).astype(int)
+    df['birth_date'] = pd.to_datetime(df['birth_date'])
+    df = df.dropna(subset=['birth_date'])
+    df['age'] = (df['year'] - df['birth_date'].dt.year).astype(int)
+    return df
+
+before = rss()
+start = time.perf_counter()
+if {method!r} == "csv":
+    df = get_data()
+else:
+    df = nobel_data.load_nobel()
+# touch every column like the pages do
+for col in df.columns:
+    np.asarray(df[col])[-1]
+elapsed = time.perf_counter() - start
+print(elapsed, rss() - before)
+"""
+
+
+def run(method):
+    out = subprocess.run([sys.executable, "-c", CHILD.format(root=ROOT, method=method)],
+                         check=True, capture_output=True, text=True).stdout.split()
+    return float(out[0]), int(out[1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    # make sure the snapshot exists so the snapshot runs measure the warm path
+    run("snapshot")
+
+    for method in ("csv", "snapshot"):
+        results = [run(method) for _ in range(args.runs)]
+        times = [r[0] for r in results]
+        rss = [r[1] for r in results]
+        print(f"{method:>8}: load {statistics.median(times) * 1000:8.2f} ms   "
+              f"rss +{statistics.median(rss) / 2**20:6.2f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Load test of serve.py: rerun throughput as the number of workers grows.
+
+For each worker count, serve.py is started and a number of concurrent
+clients connect to its websocket like a browser would. Each client opens
+a session, then keeps switching the "Explore" radio between the data pages
+and waits for every rerun to finish. The total number of reruns per second
+is reported for every worker count.
+
+Throughput only grows with the worker count while there are free cores,
+run it on a box with at least as many cores as the largest worker count.
+
+    python benchmarks/load_test.py [--workers 1 2 4] [--clients 16] [--duration 20]
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGES = ["By Country", "By Category", "By Age and Gender"]
+
+
+async def rerun(ws, radio_id=None, page=None):
+    """Request a rerun and wait for it, returns the id of the Explore radio."""
+    msg = BackMsg()
+    msg.rerun_script.SetInParent()
+    if radio_id is not None:
+        state = msg.rerun_script.widget_states.widgets.add()
+        state.id = radio_id
+        state.string_value = page
+    await ws.send(msg.SerializeToString())
+    while True:
+        forward = ForwardMsg()
+        forward.ParseFromString(await ws.recv())
+        kind = forward.WhichOneof("type")
+        if kind == "delta" and forward.delta.new_element.WhichOneof("type") == "radio":
+            radio_id = forward.delta.new_element.radio.id
+        elif kind == "script_finished":
+            if forward.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                return radio_id
+
+
+async def client(url, deadline, counts):
+    async with websockets.connect(url, subprotocols=["streamlit"], max_size=None) as ws:
+        radio_id = await rerun(ws)
+        i = 0
+        while time.perf_counter() < deadline:
+            await rerun(ws, radio_id, PAGES[i % len(PAGES)])
+            counts.append(time.perf_counter())
+            i += 1
+
+
+async def load(port, clients, duration):
+    url = f"ws://127.0.0.1:{port}/_stcore/stream"
+    counts = []
+    start = time.perf_counter()
+    await asyncio.gather(*(client(url, start + duration, counts) for _ in range(clients)))
+    return len(counts) / (time.perf_counter() - start)
+
+
+def wait_for_port(port, timeout=120):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.5)
+    raise TimeoutError(f"nothing listening on port {port}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=20, help="seconds of load per worker count")
+    parser.add_argument("--port", type=int, default=8599)
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} cores, {args.clients} clients")
+    print(f"{'workers':>8} {'reruns/s':>10} {'speedup':>8}")
+    baseline = None
+    for n in args.workers:
+        server = subprocess.Popen([sys.executable, os.path.join(ROOT, "serve.py"), "--workers", str(n),
+                                   "--host", "127.0.0.1", "--port", str(args.port),
+                                   "--allow-missing-assets"],
+                                  cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            wait_for_port(args.port)
+            for i in range(n):
+                wait_for_port(8601 + i)
+            # warm every worker's caches before measuring
+            asyncio.run(load(args.port, 2 * n, 2))
+            throughput = asyncio.run(load(args.port, args.clients, args.duration))
+        finally:
+            server.terminate()
+            server.wait()
+        baseline = baseline or throughput
+        print(f"{n:>8} {throughput:>10.1f} {throughput / baseline:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
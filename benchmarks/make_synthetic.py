@@ -0,0 +1,60 @@
+"""Generate a large synthetic laureates csv with the same schema as nobel.csv.
+
+Rows are resampled from nobel.csv with shifted prize years and birth dates.
+A small share of birth dates is made unparseable or missing, so the ingest
+has rows to drop, and another share is made partial (YYYY-00-00). The file
+is written in blocks, so memory stays flat whatever the row count.
+
+    python benchmarks/make_synthetic.py synthetic.csv --rows 20000000
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BLOCK = 1_000_000
+
+
+def make_block(base, n, rng, bad_dates, partial_dates):
+    block = base.iloc[rng.integers(0, len(base), n)].reset_index(drop=True)
+    shift = rng.integers(-5, 6, n)
+    block['year'] = np.clip(block['year'].to_numpy() + shift, 1901, 2016)
+    birth = pd.to_datetime(block['birth_date'], errors='coerce')
+    birth = birth + pd.to_timedelta(shift * 365 + rng.integers(-180, 181, n), unit='D')
+    block['birth_date'] = birth.dt.strftime('%Y-%m-%d')
+    bad = rng.random(n)
+    block.loc[bad < bad_dates / 2, 'birth_date'] = 'unknown'
+    block.loc[(bad >= bad_dates / 2) & (bad < bad_dates), 'birth_date'] = np.nan
+    partial = (bad >= bad_dates) & (bad < bad_dates + partial_dates)
+    block.loc[partial, 'birth_date'] = block.loc[partial, 'birth_date'].str[:4] + '-00-00'
+    block['laureate_id'] = rng.integers(1, 10**7, n)
+    return block
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("output")
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--bad-dates", type=float, default=0.004,
+                        help="share of rows with an unparseable or missing birth_date")
+    parser.add_argument("--partial-dates", type=float, default=0.002,
+                        help="share of rows with a partial birth_date (YYYY-00-00)")
+    args = parser.parse_args()
+
+    base = pd.read_csv(os.path.join(ROOT, "nobel.csv"))
+    rng = np.random.default_rng(args.seed)
+    written = 0
+    while written < args.rows:
+        n = min(BLOCK, args.rows - written)
+        block = make_block(base, n, rng, args.bad_dates, args.partial_dates)
+        block.to_csv(args.output, mode='w' if written == 0 else 'a', header=written == 0, index=False)
+        written += n
+        print(f"{written} rows", end="\r", flush=True)
+    print()
+
+
+if __name__ == "__main__":
+    main()
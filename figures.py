@@ -0,0 +1,112 @@
+import threading
+from collections import OrderedDict
+
+import plotly.express as px
+
+
+def country_bar(df):
+    # Plotting a Bar Plot
+    fig = px.bar(df,x="size",y="birth_country",orientation='h',color='birth_country',
+                width=800,height=600)
+
+    # Updating Figure and Axes Layouts
+    fig.update_layout(showlegend=False,xaxis=dict(title="Number of Prizes",showgrid=False),yaxis=dict(showgrid=False),
+                     font = dict(
+                                family = "Open Sans",
+                                size = 15
+                     ))
+    return fig
+
+
+def usa_share_line(prop_usa_winners):
+    # Plotting a Line Plot
+    fig = px.line(prop_usa_winners,x="decade",y="usa_born_winner",width=1200,height=700)
+    # Updating axes layout
+    fig.update_layout(yaxis=dict(title="Percentage of US Born Winners",tickformat=".2%",showgrid=False),
+        title="Percentage of US born Nobel Prize winners per decade",
+        xaxis=dict(title="Decade",showgrid=False),
+        font = dict(
+            family = "Open Sans",
+            size = 15
+            ))
+    return fig
+
+
+def field_country_bar(field_by_country):
+    fig = px.bar(field_by_country,x="birth_country",y="size",template='plotly_white',
+                    color_discrete_sequence=px.colors.qualitative.Set1,width=1500,height=800)
+    fig.update_layout(xaxis=dict(title="Country"),yaxis=dict(title="Number of Prizes"),
+                        font = dict(family="Open Sans",size=15))
+    return fig
+
+
+def age_histogram(binned,color=None):
+    # binned is the output of NobelCube.age_histogram, so the figure only
+    # carries bin positions and counts instead of every row. The last bin may
+    # be clipped to the slider range, so every bar gets its own center and width
+    binned = binned.assign(age=(binned['age_start'] + binned['age_end']) / 2,
+                           bin_width=binned['age_end'] - binned['age_start'] + 1)
+    fig = px.bar(binned,x="age",y="count",color=color,hover_data=['age_start','age_end'],
+                 width=1500,height=600,template='simple_white')
+    for trace in fig.data:
+        rows = binned if color is None else binned[binned[color] == trace.name]
+        trace.width = rows['bin_width'].to_numpy()
+    fig.update_layout(bargap=0,yaxis=dict(title="Number of Prizes"),xaxis=dict(title="Age"), font = dict(size=15,family="Open Sans"))
+    return fig
+
+
+def figure_key(page, **state):
+    """Cache key for a figure: the page plus its normalized widget state.
+
+    Slider values come back as lists (and may be numpy ints), so every value
+    is turned into plain hashable python values.
+    """
+    def normalize(value):
+        if isinstance(value, (list, tuple)):
+            return tuple(normalize(v) for v in value)
+        if hasattr(value, "item"):
+            return value.item()
+        return value
+    return (page,) + tuple(sorted((name, normalize(value)) for name, value in state.items()))
+
+
+class FigureCache:
+    """Bounded LRU cache of built Plotly figures, shared by all sessions.
+
+    A hit returns the figure built for the same key earlier, so the data
+    is not filtered and plotly.express does not build the figure again.
+    The figure is still serialized on every rerun: st.write() (like
+    st.plotly_chart()) runs Figure.to_dict() and plotly.io.to_json() on it,
+    a few ms per chart. Cached figures are shared and must not be modified
+    after they are returned.
+    """
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._figures = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, build):
+        """Return the figure cached for key, calling build() on a miss."""
+        with self._lock:
+            if key in self._figures:
+                self._figures.move_to_end(key)
+                self.hits += 1
+                return self._figures[key]
+            self.misses += 1
+        fig = build()
+        with self._lock:
+            self._figures[key] = fig
+            self._figures.move_to_end(key)
+            while len(self._figures) > self.maxsize:
+                self._figures.popitem(last=False)
+                self.evictions += 1
+        return fig
+
+    def stats(self):
+        with self._lock:
+            return {"size": len(self._figures), "maxsize": self.maxsize, "hits": self.hits,
+                    "misses": self.misses, "evictions": self.evictions}
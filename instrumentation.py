@@ -0,0 +1,135 @@
+import json
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+
+# Opt-in: set NOBEL_PROFILE=1 before starting the app (or call enable())
+ENABLED = os.environ.get("NOBEL_PROFILE") == "1"
+
+QUANTILES = (50, 95, 99)
+
+
+class Recorder:
+    """Durations and allocation peaks of the page stages, by (page, stage).
+
+    Only the last `maxlen` samples of each stage are kept.
+    """
+
+    def __init__(self, maxlen=10_000):
+        self.maxlen = maxlen
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def add(self, page, stage, seconds, alloc_bytes):
+        with self._lock:
+            samples = self._samples.get((page, stage))
+            if samples is None:
+                samples = self._samples[(page, stage)] = deque(maxlen=self.maxlen)
+            samples.append((seconds, alloc_bytes))
+
+    def summary(self):
+        """One row per (page, stage) with the count and p50/p95/p99 of both metrics."""
+        # imported here so enabling the module does not import numpy on pages without data
+        import numpy as np
+
+        with self._lock:
+            items = [(key, np.array(samples)) for key, samples in self._samples.items()]
+        rows = []
+        for (page, stage), samples in sorted(items):
+            row = {"page": page, "stage": stage, "count": len(samples),
+                   "seconds_sum": float(samples[:, 0].sum())}
+            for q, seconds, alloc in zip(QUANTILES, *np.percentile(samples, QUANTILES, axis=0).T):
+                row[f"seconds_p{q}"] = float(seconds)
+                row[f"alloc_bytes_p{q}"] = float(alloc)
+            rows.append(row)
+        return rows
+
+    def to_jsonl(self):
+        return "".join(json.dumps(row) + "\n" for row in self.summary())
+
+    def to_prometheus(self):
+        """Prometheus text exposition format, one summary per metric."""
+        rows = self.summary()
+        lines = []
+        for metric, field, total in [("nobel_stage_seconds", "seconds", "seconds_sum"),
+                                     ("nobel_stage_alloc_bytes", "alloc_bytes", None)]:
+            lines.append(f"# TYPE {metric} summary")
+            for row in rows:
+                labels = f'page="{row["page"]}",stage="{row["stage"]}"'
+                for q in QUANTILES:
+                    lines.append(f'{metric}{{{labels},quantile="{q / 100}"}} {row[f"{field}_p{q}"]}')
+                if total:
+                    lines.append(f'{metric}_sum{{{labels}}} {row[total]}')
+                lines.append(f'{metric}_count{{{labels}}} {row["count"]}')
+        return "\n".join(lines) + "\n"
+
+    def clear(self):
+        with self._lock:
+            self._samples.clear()
+
+
+recorder = Recorder()
+
+
+class _Stage:
+    def __init__(self, page, name):
+        self.page = page
+        self.name = name
+
+    def __enter__(self):
+        tracemalloc.reset_peak()
+        self._alloc = tracemalloc.get_traced_memory()[0]
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self._start
+        alloc = tracemalloc.get_traced_memory()[1] - self._alloc
+        recorder.add(self.page, self.name, seconds, alloc)
+        return False
+
+
+class _NoStage:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_STAGE = _NoStage()
+
+
+def stage(page, name):
+    """Context manager timing one stage of a page rerun.
+
+    Stages should not be nested, the allocation peak is reset on entry.
+    tracemalloc traces the whole process, not a thread: while other sessions
+    rerun at the same time, a stage's allocation peak also counts their
+    allocations, and their stages reset its peak. Profile allocations with
+    a single session, durations are per stage either way.
+    When profiling is disabled it returns a shared no-op object.
+    """
+    if not ENABLED:
+        return _NO_STAGE
+    return _Stage(page, name)
+
+
+def enable():
+    global ENABLED
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+    ENABLED = True
+
+
+def disable():
+    global ENABLED
+    ENABLED = False
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+if ENABLED:
+    enable()
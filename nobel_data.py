@@ -0,0 +1,734 @@
+import contextlib
+import hashlib
+import io
+import json
+import logging
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from snapshot import BASE_DIR, SNAPSHOT_DIR, SNAPSHOT_VERSION, read_current, read_meta_file  # noqa: F401
+
+try:
+    import fcntl
+except ImportError:  # Windows, refreshes are not locked against other processes there
+    fcntl = None
+
+# Location of the bundled dataset, its preprocessed snapshot is in SNAPSHOT_DIR
+DATA_PATH = os.path.join(BASE_DIR, "nobel.csv")
+# Snapshot versions kept on disk, older ones are removed when a new one is published
+KEEP_VERSIONS = 2
+
+# With Copy-on-Write, slices and column selections of the shared table are
+# views, and writing to one copies it instead of touching the shared data
+# (always on from pandas 3.0)
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
+# Columns the pages use, the only ones load_nobel() loads by default. The
+# free-text columns stay in the snapshot and load only when asked for.
+PAGE_COLUMNS = ['year', 'category', 'birth_country', 'sex', 'decade', 'age']
+
+# Columns kept by the chunked reader, and the ones stored as integer codes
+STREAM_COLUMNS = ['year', 'laureate_id', 'category', 'birth_country', 'sex', 'laureate_type', 'birth_date']
+CODED_COLUMNS = ['category', 'birth_country', 'sex', 'laureate_type']
+
+# Country whose share of the prizes the By Country page follows
+USA = 'United States of America'
+
+# Rows per chunk of read_chunked() for full builds, set with NOBEL_CHUNKSIZE
+# (or serve.py --chunksize). Unset, a full build keeps the reader of the
+# snapshot it replaces, read_raw() for the first one.
+CHUNKSIZE = int(os.environ["NOBEL_CHUNKSIZE"]) if os.environ.get("NOBEL_CHUNKSIZE") else None
+
+# Format of birth_date and death_date, parsed without per element inference
+DATE_FORMAT = '%Y-%m-%d'
+
+logger = logging.getLogger(__name__)
+
+
+def file_checksum(path, size=None):
+    # SHA-256 of the raw csv (of its first `size` bytes if given), used to
+    # decide when the snapshot is stale and whether rows were only appended
+    digest = hashlib.sha256()
+    remaining = os.path.getsize(path) if size is None else size
+    with open(path, "rb") as f:
+        while remaining > 0:
+            block = f.read(min(1 << 20, remaining))
+            if not block:
+                break
+            digest.update(block)
+            remaining -= len(block)
+    return digest.hexdigest()
+
+
+def _leading_years(values):
+    # year of the strings starting with 4 digits followed by '-' or nothing,
+    # read from the character codes of their first 5 characters, NaN otherwise
+    chars = np.asarray(values, dtype='U5').view(np.uint32).reshape(len(values), 5)
+    # characters below '0' wrap around to large unsigned values
+    digits = chars[:, :4] - ord('0')
+    ok = (digits <= 9).all(axis=1) & ((chars[:, 4] == ord('-')) | (chars[:, 4] == 0))
+    years = np.full(len(values), np.nan)
+    years[ok] = digits[ok] @ np.array([1000, 100, 10, 1])
+    return years
+
+
+def parse_dates(values):
+    """Parse DATE_FORMAT strings, keeping the year of partial dates.
+
+    Complete dates are parsed by pd.to_datetime with the explicit format.
+    Strings that do not parse but start with a year, like the partial
+    '1917-00-00' or '1917-05-00', get NaT and keep their year.
+    Returns the dates, the years as floats (NaN where there is none) and the
+    number of complete, partial, missing and malformed values.
+    """
+    values = pd.Series(values)
+    missing = values.isna().to_numpy()
+    if pd.api.types.is_numeric_dtype(values):
+        # a column with no value at all is read as floats
+        values = values.astype(object)
+    dates = pd.to_datetime(values, format=DATE_FORMAT, errors='coerce')
+    parsed = dates.notna().to_numpy()
+    years = np.full(len(values), np.nan)
+    years[parsed] = dates.dt.year.to_numpy()[parsed]
+    other = ~parsed & ~missing
+    if other.any():
+        years[other] = _leading_years(values[other])
+    partial = int(np.isfinite(years[other]).sum())
+    counts = {"complete": int(parsed.sum()), "partial": partial,
+              "missing": int(missing.sum()), "malformed": int(other.sum()) - partial}
+    return dates, years, counts
+
+
+def _report_dates(dates):
+    # rows without a birth year are dropped, log how many and why
+    birth = dates["birth_date"]
+    dates["rejected_rows"] = birth["missing"] + birth["malformed"]
+    log = logger.warning if birth["malformed"] else logger.info
+    log("%d rows rejected without a birth year (%d missing and %d malformed birth dates), "
+        "%d partial birth dates kept with their year", dates["rejected_rows"],
+        birth["missing"], birth["malformed"], birth["partial"])
+    return dates
+
+
+def read_raw(path=DATA_PATH):
+    # Loading the Data
+    df = pd.read_csv(path)
+    # Some Manipulations
+    df['usa_born_winner'] = df['birth_country'] == 'United States of America'
+    df['decade'] = (np.floor(df['year']/10)*10).astype(int)
+    # rows keep partial birth dates (age from their year), rows without a year are rejected;
+    # partial death dates keep their year in death_year (NaN for the living)
+    df['birth_date'], birth_year, birth_counts = parse_dates(df['birth_date'])
+    df['death_date'], df['death_year'], death_counts = parse_dates(df['death_date'])
+    keep = np.isfinite(birth_year)
+    df = df[keep]
+    df['age'] = (df['year'] - birth_year[keep]).astype(int)
+    df.attrs['dates'] = _report_dates({"birth_date": birth_counts, "death_date": death_counts})
+    return df
+
+
+def _smallest_int(values):
+    # narrowest signed integer dtype that holds every value
+    low, high = (values.min(), values.max()) if len(values) else (0, 0)
+    for dtype in (np.int8, np.int16, np.int32):
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return values.astype(dtype)
+    return values.astype(np.int64)
+
+
+def read_chunked(path=DATA_PATH, chunksize=500_000):
+    """Read a (possibly very large) laureates csv chunk by chunk.
+
+    Only STREAM_COLUMNS are read. Each chunk drops rows without a birth year
+    (see parse_dates()), derives usa_born_winner/decade/age, and encodes CODED_COLUMNS
+    into integer codes against dictionaries shared by all chunks, so peak
+    memory is one raw chunk plus the compact output arrays. The categories
+    are sorted at the end, as read_raw() + pd.Categorical would sort them.
+    """
+    dictionaries = {col: {} for col in CODED_COLUMNS}
+    parts = {name: [] for name in ['year', 'laureate_id', 'birth_date', 'usa_born_winner', 'decade', 'age'] + CODED_COLUMNS}
+
+    counts = {"complete": 0, "partial": 0, "missing": 0, "malformed": 0}
+
+    for chunk in pd.read_csv(path, usecols=STREAM_COLUMNS, chunksize=chunksize):
+        birth_date, birth_year, chunk_counts = parse_dates(chunk['birth_date'])
+        for key, count in chunk_counts.items():
+            counts[key] += count
+        keep = np.isfinite(birth_year)
+        year = chunk['year'].to_numpy()[keep]
+        birth_date = birth_date.to_numpy('datetime64[ns]')[keep]
+
+        parts['year'].append(year.astype(np.int16))
+        parts['laureate_id'].append(chunk['laureate_id'].to_numpy()[keep])
+        parts['birth_date'].append(birth_date)
+        parts['decade'].append((year // 10 * 10).astype(np.int16))
+        parts['age'].append((year - birth_year[keep]).astype(np.int16))
+
+        for col in CODED_COLUMNS:
+            local = pd.Categorical(chunk[col].to_numpy()[keep])
+            dictionary = dictionaries[col]
+            # local category code -> shared code, with -1 (missing) kept as -1
+            mapping = np.array([dictionary.setdefault(c, len(dictionary)) for c in local.categories] + [-1],
+                               dtype=np.int32)
+            parts[col].append(mapping[local.codes])
+            if col == 'birth_country':
+                usa = dictionary.get('United States of America', -2)
+                parts['usa_born_winner'].append(parts[col][-1] == usa)
+
+    columns = {}
+    for name in ['year', 'laureate_id', 'category', 'birth_country', 'sex', 'laureate_type', 'birth_date',
+                 'usa_born_winner', 'decade', 'age']:
+        values = np.concatenate(parts.pop(name))
+        if name in dictionaries:
+            # sorted categories like pd.Categorical, whatever the chunk boundaries
+            categories = sorted(dictionaries[name])
+            remap = np.append(pd.Index(categories).get_indexer(list(dictionaries[name])), -1).astype(np.int32)
+            columns[name] = pd.Categorical.from_codes(_smallest_int(remap[values]), categories)
+        else:
+            columns[name] = values
+    df = pd.DataFrame(columns, copy=False)
+    df.attrs['dates'] = _report_dates({"birth_date": counts})
+    return df
+
+
+def _save_array(path, values):
+    # saved under a temporary name and moved into place, so processes that
+    # still have the previous file memory-mapped keep reading a valid file
+    with open(path + ".tmp", "wb") as f:
+        np.save(f, values)
+    os.replace(path + ".tmp", path)
+
+
+def _write_json(path, data):
+    # written under a temporary name and moved into place, so a half written
+    # file is never read
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(path + ".tmp", path)
+
+
+def _write_meta(directory, meta):
+    _write_json(os.path.join(directory, "meta.json"), meta)
+
+
+def _write_categories(snapshot_dir, name, categories):
+    # each column's categories in a file of their own, so reading meta.json
+    # does not parse the ones of the free-text columns
+    _write_json(os.path.join(snapshot_dir, f"{name}.categories.json"), categories)
+
+
+def read_categories(snapshot_dir, name):
+    """Categories of the string column name, the labels of its stored codes."""
+    return read_meta_file(os.path.join(snapshot_dir, f"{name}.categories.json"))
+
+
+def write_snapshot(df, snapshot_dir, checksum, **info):
+    """Write df as one .npy file per column plus a meta.json describing it.
+
+    Strings are dictionary encoded (integer codes + list of categories, in a
+    <column>.categories.json file) and integers are downcast to the narrowest
+    dtype that holds them, so every column is a compact fixed-width array
+    that can be memory-mapped. Extra keyword arguments are stored in
+    meta.json as they are.
+    """
+    os.makedirs(snapshot_dir, exist_ok=True)
+    columns = []
+    for name in df.columns:
+        col = df[name]
+        if pd.api.types.is_datetime64_any_dtype(col):
+            kind, values = "datetime", col.to_numpy("datetime64[ns]")
+        elif pd.api.types.is_bool_dtype(col):
+            kind, values = "numeric", col.to_numpy()
+        elif pd.api.types.is_integer_dtype(col):
+            kind, values = "numeric", _smallest_int(col.to_numpy())
+        elif pd.api.types.is_float_dtype(col):
+            kind, values = "numeric", col.to_numpy()
+        else:
+            cat = pd.Categorical(col)
+            kind, values = "category", cat.codes
+            _write_categories(snapshot_dir, name, [str(c) for c in cat.categories])
+        _save_array(os.path.join(snapshot_dir, f"{name}.npy"), values)
+        columns.append({"name": name, "kind": kind})
+    _write_meta(snapshot_dir, {"version": SNAPSHOT_VERSION, "checksum": checksum, "columns": columns, **info})
+
+
+def append_snapshot(snapshot_dir, delta, new_dir, checksum, **info):
+    """Write to new_dir the rows of the snapshot in snapshot_dir followed by delta.
+
+    Only delta is converted, the stored columns are read as they are and
+    extended with it. String columns keep sorted categories like a full
+    build, so the stored codes are remapped when delta brings new values, and
+    the result is the snapshot a full build of all the rows would write.
+    """
+    os.makedirs(new_dir, exist_ok=True)
+    meta = read_meta(snapshot_dir)
+    columns = []
+    for col in meta["columns"]:
+        name, kind = col["name"], col["kind"]
+        stored = np.load(os.path.join(snapshot_dir, f"{name}.npy"), mmap_mode="r")
+        if kind == "category":
+            categories = read_categories(snapshot_dir, name)
+            values = delta[name].to_numpy(dtype=object)
+            present = pd.notna(values)
+            strings = values[present].astype(str)
+            merged = pd.Index(sorted(set(categories).union(strings)))
+            # stored code -> merged code, with -1 (missing) kept as -1
+            remap = np.append(merged.get_indexer(categories), -1)
+            codes = np.full(len(values), -1, dtype=np.int64)
+            codes[present] = merged.get_indexer(strings)
+            values = _smallest_int(np.concatenate([remap[stored], codes]))
+            _write_categories(new_dir, name, [str(c) for c in merged])
+        elif kind == "datetime":
+            values = np.concatenate([stored, delta[name].to_numpy("datetime64[ns]")])
+        else:
+            values = np.concatenate([stored, delta[name].to_numpy()])
+            if values.dtype.kind in "iu":
+                values = _smallest_int(values)
+        _save_array(os.path.join(new_dir, f"{name}.npy"), values)
+        columns.append({"name": name, "kind": kind})
+    _write_meta(new_dir, {"version": SNAPSHOT_VERSION, "checksum": checksum, "columns": columns, **info})
+
+
+def read_meta(snapshot_dir):
+    return read_meta_file(os.path.join(snapshot_dir, "meta.json"))
+
+
+def read_snapshot(snapshot_dir, meta=None, columns=None):
+    meta = meta or read_meta(snapshot_dir)
+    data = {}
+    for col in meta["columns"]:
+        if columns is not None and col["name"] not in columns:
+            continue
+        values = np.load(os.path.join(snapshot_dir, f"{col['name']}.npy"), mmap_mode="r")
+        if col["kind"] == "category":
+            data[col["name"]] = pd.Categorical.from_codes(values, read_categories(snapshot_dir, col["name"]))
+        else:
+            data[col["name"]] = values
+    return pd.DataFrame(data, copy=False)
+
+
+def _publish(snapshot_dir, name, stat):
+    # CURRENT is replaced atomically: every reader opening the snapshot after
+    # this sees the new version, readers of the old one keep their maps
+    _write_json(os.path.join(snapshot_dir, "CURRENT"), {"format": SNAPSHOT_VERSION, "name": name,
+                                                        "csv_size": stat.st_size, "csv_mtime_ns": stat.st_mtime_ns})
+    # files still mapped by other processes stay readable after removal
+    others = sorted((entry for entry in os.scandir(snapshot_dir) if entry.is_dir() and entry.name != name),
+                    key=lambda entry: entry.stat().st_mtime, reverse=True)
+    for entry in others[KEEP_VERSIONS - 1:]:
+        shutil.rmtree(entry.path, ignore_errors=True)
+
+
+@contextlib.contextmanager
+def _locked(snapshot_dir):
+    # one refresh at a time, across the sessions and processes of the server
+    os.makedirs(snapshot_dir, exist_ok=True)
+    with open(os.path.join(snapshot_dir, ".lock"), "w") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        yield
+
+
+def _add_counts(a, b):
+    # sum of two (nested) dicts of counts with the same keys
+    return {key: _add_counts(a[key], b[key]) if isinstance(a[key], dict) else a[key] + b[key] for key in a}
+
+
+def _unchanged(current, stat):
+    return current is not None and (current["csv_size"], current["csv_mtime_ns"]) == (stat.st_size, stat.st_mtime_ns)
+
+
+def appended_rows(path, snapshot_dir, meta):
+    """Rows appended to the csv since the snapshot in snapshot_dir, derived like a full build.
+
+    Returns None when the csv changed in another way, or when the new rows
+    are not new prizes, i.e. a (year, laureate_id) pair already stored or a
+    year before the last stored one. A full rebuild is needed then.
+    """
+    size = meta["csv_size"]
+    if os.path.getsize(path) <= size or file_checksum(path, size) != meta["checksum"]:
+        return None
+    with open(path, "rb") as f:
+        header = f.readline()
+        f.seek(size - 1)
+        # the old file must end on a complete row
+        if f.read(1) != b"\n":
+            return None
+        buffer = io.BytesIO(header + f.read())
+    delta = read_raw(buffer) if meta["chunksize"] is None else read_chunked(buffer, meta["chunksize"])
+
+    kinds = {col["name"]: col["kind"] for col in meta["columns"]}
+    if set(delta.columns) != set(kinds):
+        return None
+    for name, kind in kinds.items():
+        if kind == "numeric" and not pd.api.types.is_numeric_dtype(delta[name]):
+            return None
+        if kind == "datetime" and not pd.api.types.is_datetime64_any_dtype(delta[name]):
+            return None
+
+    if len(delta):
+        stored = read_snapshot(snapshot_dir, meta, columns=['year', 'laureate_id'])
+        first = delta['year'].min()
+        if first < stored['year'].max():
+            return None
+        later = stored[stored['year'] >= first]
+        keys = pd.MultiIndex.from_arrays([delta['year'], delta['laureate_id']])
+        if keys.isin(pd.MultiIndex.from_arrays([later['year'], later['laureate_id']])).any():
+            return None
+    return delta
+
+
+def refresh(path=DATA_PATH, snapshot_dir=SNAPSHOT_DIR, chunksize=None):
+    """Bring the snapshot up to date with the csv and return the name of its version.
+
+    Cheap when the csv did not change, only its size and mtime are compared
+    with the ones recorded in CURRENT. When rows were only appended to the
+    csv, those rows alone are read and derived, and the stored columns and
+    the aggregate cube are extended with them. Any other change rebuilds the
+    snapshot from the csv, with read_chunked() when a chunksize is given (for
+    csv files too large to load at once) and read_raw() otherwise. Without
+    a chunksize argument, CHUNKSIZE is used if set, else the chunksize the
+    previous version was built with, so a chunked snapshot stays chunked.
+
+    Each version is written to its own directory, with its cube, its
+    analytics (see compute_analytics()) and years.json (the first and last
+    prize year, see snapshot.read_years()), and then published by replacing
+    CURRENT, so readers see the old or the new version, never a mix.
+    """
+    stat = os.stat(path)
+    current = read_current(snapshot_dir)
+    if _unchanged(current, stat):
+        return current["name"]
+    with _locked(snapshot_dir):
+        # another session or process may have refreshed it in the meantime
+        stat = os.stat(path)
+        current = read_current(snapshot_dir)
+        if _unchanged(current, stat):
+            return current["name"]
+        meta = current and read_meta(os.path.join(snapshot_dir, current["name"]))
+        checksum = file_checksum(path)
+        name = checksum[:16]
+        if meta is not None and meta["checksum"] == checksum:
+            # touched but not modified
+            _publish(snapshot_dir, current["name"], stat)
+            return current["name"]
+
+        new_dir = os.path.join(snapshot_dir, name)
+        cube_dir = os.path.join(new_dir, "cube")
+        delta = None if meta is None else appended_rows(path, os.path.join(snapshot_dir, current["name"]), meta)
+        if delta is not None:
+            old_dir = os.path.join(snapshot_dir, current["name"])
+            dates = _add_counts(meta["dates"], delta.attrs['dates'])
+            append_snapshot(old_dir, delta, new_dir, checksum, csv_size=stat.st_size,
+                            chunksize=meta["chunksize"], dates=dates, build="append")
+            # the appended rows as stored, coded with the new categories
+            stored = len(np.load(os.path.join(old_dir, "year.npy"), mmap_mode="r"))
+            delta = read_snapshot(new_dir, columns=PAGE_COLUMNS).iloc[stored:]
+            NobelCube.load(os.path.join(old_dir, "cube")).extended(delta).save(cube_dir, checksum)
+        else:
+            if chunksize is None:
+                chunksize = CHUNKSIZE if CHUNKSIZE is not None or meta is None else meta["chunksize"]
+            df = read_raw(path) if chunksize is None else read_chunked(path, chunksize)
+            write_snapshot(df, new_dir, checksum, csv_size=stat.st_size, chunksize=chunksize,
+                           dates=df.attrs['dates'], build="full")
+            NobelCube(read_snapshot(new_dir, columns=PAGE_COLUMNS)).save(cube_dir, checksum)
+        _write_json(os.path.join(new_dir, "analytics.json"), compute_analytics(new_dir))
+        # read by snapshot.read_years(), without pandas
+        bounds = read_meta(cube_dir)
+        _write_json(os.path.join(new_dir, "years.json"),
+                    {"first_year": bounds["min_year"], "last_year": bounds["max_year"]})
+        _publish(snapshot_dir, name, stat)
+        return name
+
+
+def load_nobel(path=DATA_PATH, snapshot_dir=SNAPSHOT_DIR, chunksize=None, columns=PAGE_COLUMNS, version=None):
+    """Return the preprocessed laureates table, served from the local snapshot.
+
+    The snapshot is first brought up to date with the csv (see refresh()),
+    unless a version returned by refresh() is given.
+    Columns are read-only memory maps of the snapshot files, so the frame can
+    be shared by every session of the server without being copied.
+
+    Only `columns` are loaded (PAGE_COLUMNS by default, None for all of them),
+    so e.g. load_nobel(columns=['full_name', 'motivation']) reads the text
+    columns on demand, in the same row order.
+    """
+    if version is None:
+        version = refresh(path, snapshot_dir, chunksize)
+    return read_snapshot(os.path.join(snapshot_dir, version), columns=columns)
+
+
+class NobelCube:
+    """Prize counts aggregated once at load time, for the page counters and charts.
+
+    Two dense count arrays are kept, each with a cumulative sum along its
+    slider axis so any slider range is the difference of two slices:
+
+    * year x category x birth_country x sex (year slider pages)
+    * age x sex (age slider page, also used to bin the age histograms)
+
+    The last slot of the category, birth_country and sex axes holds rows where
+    that value is missing, so totals still include them. category_order lists
+    the categories in order of first appearance, for the category selectbox.
+    """
+
+    def __init__(self, df):
+        self.categories = pd.Categorical(df['category']).categories
+        self.category_order = self._first_seen(df['category'])
+        self.countries = pd.Categorical(df['birth_country']).categories
+        self.sexes = pd.Categorical(df['sex']).categories
+
+        year = np.asarray(df['year'])
+        age = np.asarray(df['age'])
+        self.min_year, self.max_year = int(year.min()), int(year.max())
+        self.min_age, self.max_age = int(age.min()), int(age.max())
+
+        counts, age_counts = self._zeros()
+        self._count(df, counts, age_counts)
+
+    def _zeros(self):
+        counts = np.zeros((self.max_year - self.min_year + 1, len(self.categories) + 1,
+                           len(self.countries) + 1, len(self.sexes) + 1), dtype=np.int32)
+        age_counts = np.zeros((self.max_age - self.min_age + 1, len(self.sexes) + 1), dtype=np.int32)
+        return counts, age_counts
+
+    def _count(self, df, counts, age_counts):
+        # add the rows of df to the counts, then freeze them into the cumulative sums
+        cat_codes = self._codes(pd.Categorical(df['category'], categories=self.categories))
+        country_codes = self._codes(pd.Categorical(df['birth_country'], categories=self.countries))
+        sex_codes = self._codes(pd.Categorical(df['sex'], categories=self.sexes))
+        year = np.asarray(df['year'])
+        age = np.asarray(df['age'])
+        np.add.at(counts, (year - self.min_year, cat_codes, country_codes, sex_codes), 1)
+        self.year_cumsum = self._cumsum(counts)
+        np.add.at(age_counts, (age - self.min_age, sex_codes), 1)
+        age_counts.flags.writeable = False
+        self.age_counts = age_counts
+        self.age_cumsum = self._cumsum(age_counts)
+
+    def extended(self, delta):
+        """A new cube counting the rows of this one plus the rows of delta.
+
+        Only the rows of delta are counted, the existing counts are moved to
+        the axes of the new cube, which grow with new years and ages. The
+        category, birth_country and sex columns of delta must be categoricals
+        whose categories include the labels of this cube (e.g. rows of the
+        extended snapshot), they become the labels of the new cube.
+        """
+        if not len(delta):
+            return self
+        cube = NobelCube.__new__(NobelCube)
+        cube.categories = pd.Categorical(delta['category']).categories
+        cube.countries = pd.Categorical(delta['birth_country']).categories
+        cube.sexes = pd.Categorical(delta['sex']).categories
+        new = self._first_seen(delta['category'])
+        cube.category_order = self.category_order.append(new[~new.isin(self.category_order)])
+        year = np.asarray(delta['year'])
+        age = np.asarray(delta['age'])
+        cube.min_year, cube.max_year = min(self.min_year, int(year.min())), max(self.max_year, int(year.max()))
+        cube.min_age, cube.max_age = min(self.min_age, int(age.min())), max(self.max_age, int(age.max()))
+
+        counts, age_counts = cube._zeros()
+        years = np.arange(self.min_year, self.max_year + 1) - cube.min_year
+        ages = np.arange(self.min_age, self.max_age + 1) - cube.min_age
+        cats, countries, sexes = (self._remap(getattr(self, name), getattr(cube, name))
+                                  for name in ['categories', 'countries', 'sexes'])
+        counts[np.ix_(years, cats, countries, sexes)] = np.diff(self.year_cumsum, axis=0)
+        age_counts[np.ix_(ages, sexes)] = self.age_counts
+        cube._count(delta, counts, age_counts)
+        return cube
+
+    @staticmethod
+    def _first_seen(values):
+        return pd.Index(pd.unique(np.asarray(values.dropna(), dtype=object)))
+
+    @staticmethod
+    def _remap(old, new):
+        # position of each old label (and of the missing slot) on the new axis
+        positions = new.get_indexer(old)
+        if (positions < 0).any():
+            raise ValueError(f"labels {list(old[positions < 0])} are missing from the new cube")
+        return np.append(positions, len(new))
+
+    @staticmethod
+    def _codes(cat):
+        # missing values (code -1) go to the extra last slot
+        codes = cat.codes.astype(np.intp)
+        codes[codes < 0] = len(cat.categories)
+        return codes
+
+    @staticmethod
+    def _cumsum(counts):
+        # prefix sums with a leading zero row, so range [a, b] is cs[b+1] - cs[a]
+        cs = np.zeros((counts.shape[0] + 1,) + counts.shape[1:], dtype=np.int64)
+        np.cumsum(counts, axis=0, out=cs[1:])
+        cs.flags.writeable = False
+        return cs
+
+    @staticmethod
+    def _range(cumsum, start, lo, hi):
+        lo = min(max(int(lo) - start, 0), cumsum.shape[0] - 1)
+        hi = min(max(int(hi) - start + 1, lo), cumsum.shape[0] - 1)
+        return cumsum[hi] - cumsum[lo]
+
+    def year_counts(self, year_range):
+        """category x birth_country x sex counts for years in year_range (inclusive)."""
+        return self._range(self.year_cumsum, self.min_year, *year_range)
+
+    def category_counts(self, year_range):
+        counts = self.year_counts(year_range).sum(axis=(1, 2))[:-1]
+        return pd.Series(counts, index=pd.Index(self.categories, name='category'), name='count')
+
+    def top_countries(self, year_range, category=None, n=10):
+        """Countries of birth with the most prizes, like value_counts().head(n)."""
+        counts = self.year_counts(year_range)
+        if category is not None:
+            counts = counts[self.categories.get_loc(category)]
+        else:
+            counts = counts.sum(axis=0)
+        counts = counts.sum(axis=1)[:-1]
+        order = np.argsort(-counts, kind='stable')[:n]
+        order = order[counts[order] > 0]
+        return pd.Series(counts[order], index=pd.Index(self.countries[order], name='birth_country'), name='count')
+
+    def decade_counts(self):
+        """decade x birth_country counts, the last column holds missing countries."""
+        yearly = np.diff(self.year_cumsum, axis=0).sum(axis=(1, 3))
+        decade = np.arange(self.min_year, self.max_year + 1) // 10 * 10
+        counts = pd.DataFrame(yearly, index=pd.Index(decade, name='decade')).groupby(level=0).sum()
+        return counts[counts.sum(axis=1) > 0]
+
+    def decade_share(self, country):
+        """Share of the prizes won by laureates born in country, per decade."""
+        counts = self.decade_counts()
+        return (counts[self.countries.get_loc(country)] / counts.sum(axis=1)).rename('share')
+
+    def decade_top_country(self):
+        """Country of birth with the most prizes in each decade."""
+        counts = self.decade_counts()
+        top = counts.to_numpy()[:, :-1].argmax(axis=1)
+        return pd.Series(self.countries[top], index=counts.index, name='birth_country')
+
+    def age_histogram(self, age_range, nbins=20, sex=None):
+        """Prize counts per age bin and sex for ages in age_range (inclusive).
+
+        Ages are split into at most nbins bins of equal whole-year width.
+        Returns a long frame with columns age_start, age_end, sex and count,
+        so the work and the chart payload depend on nbins, not on the rows.
+        Pass sex to keep only that sex's bins.
+        """
+        lo = min(max(int(age_range[0]), self.min_age), self.max_age)
+        hi = min(max(int(age_range[1]), lo), self.max_age)
+        counts = self.age_counts[lo - self.min_age:hi - self.min_age + 1, :-1]
+        width = -(-len(counts) // nbins)
+        starts = np.arange(0, len(counts), width)
+        binned = np.add.reduceat(counts, starts, axis=0)
+        age_start = np.repeat(lo + starts, len(self.sexes))
+        binned = pd.DataFrame({
+            'age_start': age_start,
+            'age_end': np.minimum(age_start + width - 1, hi),
+            'sex': np.tile(np.asarray(self.sexes), len(starts)),
+            'count': binned.ravel(),
+        })
+        if sex is not None:
+            binned = binned[binned['sex'] == sex].reset_index(drop=True)
+        return binned
+
+    def sex_counts(self, age_range):
+        counts = self._range(self.age_cumsum, self.min_age, *age_range)[:-1]
+        return pd.Series(counts, index=pd.Index(self.sexes, name='sex'), name='count')
+
+    _ARRAYS = ['year_cumsum', 'age_counts', 'age_cumsum']
+    _LABELS = ['categories', 'category_order', 'countries', 'sexes']
+    _BOUNDS = ['min_year', 'max_year', 'min_age', 'max_age']
+
+    def save(self, directory, checksum):
+        """Store the count arrays as .npy files, so other processes can map them."""
+        os.makedirs(directory, exist_ok=True)
+        for name in self._ARRAYS:
+            _save_array(os.path.join(directory, f"{name}.npy"), getattr(self, name))
+        meta = {"checksum": checksum}
+        meta.update({name: [str(v) for v in getattr(self, name)] for name in self._LABELS})
+        meta.update({name: getattr(self, name) for name in self._BOUNDS})
+        _write_meta(directory, meta)
+
+    @classmethod
+    def load(cls, directory, meta=None):
+        """A cube saved with save(), its arrays read-only memory maps of the files."""
+        meta = meta or read_meta(directory)
+        cube = cls.__new__(cls)
+        for name in cls._ARRAYS:
+            setattr(cube, name, np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r"))
+        for name in cls._LABELS:
+            setattr(cube, name, pd.Index(meta[name]))
+        for name in cls._BOUNDS:
+            setattr(cube, name, meta[name])
+        return cube
+
+
+def load_cube(path=DATA_PATH, snapshot_dir=SNAPSHOT_DIR, version=None):
+    """Return the NobelCube stored with the snapshot (see refresh()).
+
+    The cube is built with each snapshot version, every process maps the
+    stored arrays instead of rebuilding them.
+    """
+    if version is None:
+        version = refresh(path, snapshot_dir)
+    return NobelCube.load(os.path.join(snapshot_dir, version, "cube"))
+
+
+def _laureate(snapshot_dir, meta, row):
+    # the prize of one row, for the youngest and oldest laureates
+    names = [col["name"] for col in meta["columns"]]
+    columns = [name for name in ['full_name', 'year', 'category', 'age'] if name in names]
+    record = read_snapshot(snapshot_dir, meta, columns).iloc[row]
+    return {name: (int(record[name]) if name in ('year', 'age') else str(record[name])) for name in columns}
+
+
+def compute_analytics(snapshot_dir):
+    """Statistics of the snapshot in snapshot_dir that no widget changes.
+
+    The pages read them for the US share chart and for the numbers in their
+    text, they are computed once per snapshot version (mostly from its cube)
+    and stored next to it as analytics.json.
+    """
+    meta = read_meta(snapshot_dir)
+    cube = NobelCube.load(os.path.join(snapshot_dir, "cube"))
+    share = cube.decade_share(USA)
+    top = cube.decade_top_country()
+    # first decade from which USA stays the top country of birth
+    since = None
+    for decade, country in top[::-1].items():
+        if country != USA:
+            break
+        since = int(decade)
+    age = read_snapshot(snapshot_dir, meta, ['age'])['age'].to_numpy()
+    return {
+        "checksum": meta["checksum"],
+        "laureates": int(cube.age_counts.sum()),
+        "by_sex": {str(sex): int(count) for sex, count in zip(cube.sexes, cube.age_counts.sum(axis=0))},
+        "usa_share_by_decade": {"decade": [int(d) for d in share.index], "share": [float(v) for v in share]},
+        "usa_top_since": since,
+        "usa_top_since_share": None if since is None else float(share[since]),
+        "usa_peak_decade": int(share.idxmax()),
+        "youngest": _laureate(snapshot_dir, meta, int(age.argmin())),
+        "oldest": _laureate(snapshot_dir, meta, int(age.argmax())),
+    }
+
+
+def snapshot_info(version, snapshot_dir=SNAPSHOT_DIR):
+    """How a snapshot version was built, with the date parsing counts (rejected rows)."""
+    meta = read_meta(os.path.join(snapshot_dir, version))
+    return {"version": version, "build": meta["build"], "csv_size": meta["csv_size"], "dates": meta["dates"]}
+
+
+def load_analytics(path=DATA_PATH, snapshot_dir=SNAPSHOT_DIR, version=None):
+    """Return the analytics stored with the snapshot (see compute_analytics())."""
+    if version is None:
+        version = refresh(path, snapshot_dir)
+    return read_meta_file(os.path.join(snapshot_dir, version, "analytics.json"))
@@ -0,0 +1,124 @@
+"""Serve Prize.py from several Streamlit worker processes behind one port.
+
+Each Streamlit process runs all of its sessions' reruns under one GIL, so
+a single process saturates one core. This starts N workers on consecutive
+ports and a small TCP balancer on --port that hands every new connection
+to the worker with the fewest open connections. A Streamlit session is a
+single websocket, so it stays on the worker it was first sent to.
+
+The snapshot and the aggregate cube are prepared once here, before the
+workers start. The workers then only memory-map the same read-only files,
+so the operating system keeps one copy of the dataset in its page cache,
+shared by every worker, instead of each worker parsing nobel.csv.
+
+    python serve.py --workers 4 --port 8501 [--chunksize 100000]
+"""
+import argparse
+import asyncio
+import os
+import signal
+import subprocess
+import sys
+
+import assets
+import nobel_data
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def prepare(chunksize=None, allow_missing_assets=False):
+    """Check the assets, and build the snapshot and the cube if they are missing or stale.
+
+    Missing assets stop the deployment unless allow_missing_assets is set,
+    then the pages show placeholders for them.
+    """
+    assets.check(strict=not allow_missing_assets)
+    nobel_data.refresh(chunksize=chunksize)
+
+
+def start_workers(n, base_port, chunksize=None):
+    # the workers refresh the snapshot too when the csv changes, with the same chunksize
+    env = dict(os.environ)
+    # a browser's media requests may reach another worker than its session,
+    # so the pages keep media out of Streamlit's per-process media store
+    env["NOBEL_BALANCED"] = "1"
+    if chunksize is not None:
+        env["NOBEL_CHUNKSIZE"] = str(chunksize)
+    workers = []
+    for i in range(n):
+        command = [sys.executable, "-m", "streamlit", "run", os.path.join(BASE_DIR, "Prize.py"),
+                   "--server.port", str(base_port + i), "--server.address", "127.0.0.1",
+                   "--server.headless", "true", "--browser.gatherUsageStats", "false"]
+        workers.append(subprocess.Popen(command, cwd=BASE_DIR, env=env))
+    return workers
+
+
+class Balancer:
+    """Least-connections TCP proxy in front of the worker ports."""
+
+    def __init__(self, ports):
+        self.open = {port: 0 for port in ports}
+
+    async def handle(self, client_reader, client_writer):
+        port = min(self.open, key=self.open.get)
+        self.open[port] += 1
+        try:
+            worker_reader, worker_writer = await asyncio.open_connection("127.0.0.1", port)
+        except OSError:
+            self.open[port] -= 1
+            client_writer.close()
+            return
+        try:
+            await asyncio.gather(self.pipe(client_reader, worker_writer),
+                                 self.pipe(worker_reader, client_writer))
+        finally:
+            self.open[port] -= 1
+
+    @staticmethod
+    async def pipe(reader, writer):
+        try:
+            while data := await reader.read(65536):
+                writer.write(data)
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+
+
+async def balance(ports, host, port):
+    server = await asyncio.start_server(Balancer(ports).handle, host, port)
+    print(f"serving {len(ports)} workers on http://{host}:{port}", flush=True)
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8501)
+    parser.add_argument("--worker-port", type=int, default=8601, help="port of the first worker")
+    parser.add_argument("--chunksize", type=int, default=nobel_data.CHUNKSIZE,
+                        help="build the snapshot with read_chunked() in chunks of this many rows")
+    parser.add_argument("--allow-missing-assets", action="store_true",
+                        help="start even if `python assets.py fetch` has not been run, with placeholder images")
+    args = parser.parse_args()
+
+    prepare(args.chunksize, args.allow_missing_assets)
+    workers = start_workers(args.workers, args.worker_port, args.chunksize)
+    ports = [args.worker_port + i for i in range(args.workers)]
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        asyncio.run(balance(ports, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for worker in workers:
+            worker.terminate()
+        for worker in workers:
+            worker.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""Location, format and CURRENT pointer of the local snapshot of nobel.csv.
+
+The snapshot is built by nobel_data.refresh(). These readers only use the
+standard library, so pages without data (the Introduction) can read the
+published version without importing nobel_data and pandas.
+"""
+import json
+import os
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SNAPSHOT_DIR = os.path.join(BASE_DIR, ".nobel_snapshot")
+# Bumped whenever the snapshot layout changes, so old snapshots get rebuilt
+SNAPSHOT_VERSION = 10
+
+
+def read_meta_file(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def read_current(snapshot_dir=SNAPSHOT_DIR):
+    """The CURRENT pointer of snapshot_dir: the published version and the csv it was built from."""
+    current = read_meta_file(os.path.join(snapshot_dir, "CURRENT"))
+    if current is None or current.get("format") != SNAPSHOT_VERSION:
+        return None
+    return current
+
+
+def read_years(snapshot_dir=SNAPSHOT_DIR):
+    """First and last prize year of the published version, None if there is none."""
+    current = read_current(snapshot_dir)
+    years = current and read_meta_file(os.path.join(snapshot_dir, current["name"], "years.json"))
+    if not years:
+        return None
+    return years["first_year"], years["last_year"]
@@ -0,0 +1,22 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import nobel_data  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def nobel():
+    """nobel.csv as it is on disk, without any derived column."""
+    return pd.read_csv(nobel_data.DATA_PATH)
+
+
+@pytest.fixture(scope="session")
+def raw():
+    """The full frame of read_raw(), rows renumbered."""
+    return nobel_data.read_raw().reset_index(drop=True)
@@ -0,0 +1,60 @@
+"""The count cube gives every counter and chart input of the pages.
+
+Each is computed the old way (masks and value_counts over the full frame of
+read_raw()) and from the cube over the compact snapshot frame, and they
+must be identical.
+"""
+import numpy as np
+import pytest
+
+from nobel_data import NobelCube, load_nobel
+
+YEAR_RANGES = [(1901, 2016), (1901, 1901), (1950, 1980), (1968, 1969), (2000, 2016)]
+AGE_RANGES = [(17, 90), (17, 17), (30, 50), (60, 90), (80, 90)]
+
+
+@pytest.fixture(scope="module")
+def compact():
+    return load_nobel()
+
+
+@pytest.fixture(scope="module")
+def cube(compact):
+    return NobelCube(compact)
+
+
+@pytest.mark.parametrize("lo,hi", YEAR_RANGES)
+def test_year_counters(raw, cube, lo, hi):
+    categories = sorted(raw['category'].unique())
+    df_selected = raw[(raw['year'] >= lo) & (raw['year'] <= hi)]
+    old = df_selected['birth_country'].value_counts()
+    new = cube.top_countries((lo, hi))
+    assert (old.loc[new.index].to_numpy() == new.to_numpy()).all()
+    assert len(new) == min(10, len(old)) and (new.min() if len(new) else 0) >= old.head(10).min()
+    old = df_selected['category'].value_counts()
+    new = cube.category_counts((lo, hi))
+    assert all(old.get(c, 0) == new[c] for c in categories)
+    for category in categories:
+        old = df_selected[df_selected['category'] == category]['birth_country'].value_counts()
+        new = cube.top_countries((lo, hi), category)
+        assert (old.loc[new.index].to_numpy() == new.to_numpy()).all()
+
+
+@pytest.mark.parametrize("lo,hi", AGE_RANGES)
+def test_age_counters(raw, cube, lo, hi):
+    selected = raw[(raw['age'] >= lo) & (raw['age'] <= hi)]
+    old = selected['sex'].value_counts()
+    new = cube.sex_counts((lo, hi))
+    assert all(old.get(s, 0) == new[s] for s in ['Female', 'Male'])
+    assert cube.age_histogram((lo, hi))['count'].sum() == len(selected)
+
+
+def test_usa_share(raw, compact):
+    old = raw.groupby('decade')['usa_born_winner'].mean()
+    new = (compact['birth_country'] == 'United States of America').groupby(compact['decade']).mean()
+    assert np.allclose(old.to_numpy(), new.to_numpy()) and (old.index == new.index).all()
+
+
+def test_lazy_text_columns_keep_row_order(raw):
+    text = load_nobel(columns=['full_name', 'motivation'])
+    assert (text['full_name'].astype(str).to_numpy() == raw['full_name'].astype(str).to_numpy()).all()
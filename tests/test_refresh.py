@@ -0,0 +1,109 @@
+"""Appending to the csv and refreshing gives the same snapshot as a full build.
+
+nobel.csv is split by prize year: the early years are written to a
+temporary csv and built, then the later years are appended in batches and
+each refresh must take the incremental path. The result is compared with a
+full build of the final csv: every stored column (values and categories),
+every array of the aggregate cube and the analytics must be identical.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import nobel_data
+
+BATCHES = [(1901, 2010), (2011, 2013), (2014, 2016)]
+CHUNKSIZES = [None, 100]
+
+
+def build(path, snapshot_dir, chunksize=None):
+    version = nobel_data.refresh(path, snapshot_dir, chunksize)
+    return version, nobel_data.read_meta(os.path.join(snapshot_dir, version))
+
+
+def assert_same_snapshot(dir_a, dir_b):
+    meta_a, meta_b = nobel_data.read_meta(dir_a), nobel_data.read_meta(dir_b)
+    assert meta_a["checksum"] == meta_b["checksum"]
+    assert meta_a["columns"] == meta_b["columns"], "column kinds differ"
+    assert meta_a["dates"] == meta_b["dates"], "date counts differ"
+    for col in meta_a["columns"]:
+        a = np.load(os.path.join(dir_a, f"{col['name']}.npy"))
+        b = np.load(os.path.join(dir_b, f"{col['name']}.npy"))
+        assert a.dtype.kind == b.dtype.kind and np.array_equal(a, b, equal_nan=a.dtype.kind in "fM"), \
+            f"column {col['name']} differs"
+        if col["kind"] == "category":
+            assert nobel_data.read_categories(dir_a, col["name"]) == nobel_data.read_categories(dir_b, col["name"]), \
+                f"categories of {col['name']} differ"
+    cube_a = nobel_data.NobelCube.load(os.path.join(dir_a, "cube"))
+    cube_b = nobel_data.NobelCube.load(os.path.join(dir_b, "cube"))
+    for name in nobel_data.NobelCube._LABELS:
+        assert list(getattr(cube_a, name)) == list(getattr(cube_b, name)), f"cube {name} differ"
+    for name in nobel_data.NobelCube._BOUNDS:
+        assert getattr(cube_a, name) == getattr(cube_b, name), f"cube {name} differs"
+    for name in nobel_data.NobelCube._ARRAYS:
+        assert np.array_equal(getattr(cube_a, name), getattr(cube_b, name)), f"cube {name} differs"
+    for name in ["analytics.json", "years.json"]:
+        assert nobel_data.read_meta_file(os.path.join(dir_a, name)) == \
+            nobel_data.read_meta_file(os.path.join(dir_b, name)), f"{name} differ"
+
+
+@pytest.mark.parametrize("chunksize", CHUNKSIZES)
+def test_appends_match_full_build(nobel, tmp_path, chunksize):
+    path = str(tmp_path / "nobel.csv")
+    incremental_dir = str(tmp_path / "incremental")
+    full_dir = str(tmp_path / "full")
+
+    for i, (first, last) in enumerate(BATCHES):
+        rows = nobel[nobel['year'].between(first, last)]
+        if i == len(BATCHES) - 1:
+            # a laureate born in a country not seen before (sorting first, so the
+            # stored codes are remapped), with partial birth and death dates
+            extra = rows.tail(1).assign(laureate_id=nobel['laureate_id'].max() + 1, birth_country="Aaland",
+                                        birth_date="1950-00-00", death_date="2020-00-00")
+            rows = pd.concat([rows, extra])
+        rows.to_csv(path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+        version, meta = build(path, incremental_dir, chunksize)
+        assert meta["build"] == ("full" if i == 0 else "append"), f"batch {first}-{last} was not appended"
+
+    _, full_meta = build(path, full_dir, chunksize)
+    assert full_meta["build"] == "full"
+    assert_same_snapshot(os.path.join(incremental_dir, version), os.path.join(full_dir, version))
+
+    last = nobel_data.read_snapshot(os.path.join(full_dir, version)).iloc[-1]
+    assert last['age'] == last['year'] - 1950, "partial birth date lost its year"
+    if chunksize is None:
+        # read_chunked() does not keep the death dates
+        assert last['death_year'] == 2020, "partial death date lost its year"
+
+
+@pytest.mark.parametrize("chunksize", CHUNKSIZES)
+def test_other_changes_rebuild_in_full(nobel, tmp_path, monkeypatch, chunksize):
+    monkeypatch.setattr(nobel_data, "CHUNKSIZE", None)
+    path = str(tmp_path / "nobel.csv")
+    snapshot_dir = str(tmp_path / "snapshot")
+    nobel.to_csv(path, index=False)
+    build(path, snapshot_dir, chunksize)
+
+    # a rewritten row is not an append; without a chunksize argument the
+    # rebuild keeps the reader of the previous version
+    nobel.iloc[:-1].to_csv(path, index=False)
+    _, meta = build(path, snapshot_dir)
+    assert (meta["build"], meta["chunksize"]) == ("full", chunksize)
+
+    # a prize already in the csv again, same (year, laureate_id)
+    nobel.iloc[-2:-1].to_csv(path, mode="a", header=False, index=False)
+    _, meta = build(path, snapshot_dir)
+    assert (meta["build"], meta["chunksize"]) == ("full", chunksize)
+
+
+def test_unchanged_csv_keeps_version(nobel, tmp_path):
+    path = str(tmp_path / "nobel.csv")
+    snapshot_dir = str(tmp_path / "snapshot")
+    nobel.to_csv(path, index=False)
+    version, _ = build(path, snapshot_dir)
+    # touched but not modified
+    os.utime(path)
+    assert build(path, snapshot_dir)[0] == version
+    assert nobel_data.read_current(snapshot_dir)["name"] == version
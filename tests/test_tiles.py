@@ -0,0 +1,61 @@
+"""The counter tiles of the pages match value_counts() over nobel.csv.
+
+Prize.py is run headless with AppTest. For several slider ranges the
+"By Category" tiles (one per category) and the "By Age and Gender" tiles
+(females and males) are read back from the rendered html, and each count
+must equal value_counts() of read_raw() over the same inclusive range.
+Every tile is checked, e.g. the Peace tile once showed the Medicine count.
+"""
+import os
+import re
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+YEAR_RANGES = [None, (1901, 1901), (1901, 1968), (1969, 1969), (1960, 1990), (2000, 2016), (2016, 2016)]
+AGE_RANGES = [None, (17, 30), (31, 31), (40, 60), (61, 79), (80, 90), (90, 90)]
+GENDER_LABELS = {"Females": "Female", "Males": "Male"}
+
+TILE = re.compile(r'>([^<>]+)</div>\s*<div style="font-size:50px;padding-left:30px;">(\d+)</div>')
+
+
+@pytest.fixture(scope="module")
+def app():
+    at = AppTest.from_file(os.path.join(ROOT, "Prize.py"), default_timeout=60).run()
+    assert not at.exception, at.exception
+    return at
+
+
+def rendered_tiles(at):
+    """label: count of the tiles on the current page."""
+    grids = [md.value for md in at.markdown if "grid-auto-flow" in md.value]
+    assert len(grids) == 1, f"{len(grids)} tile grids on the page"
+    return {label.strip(): int(count) for label, count in TILE.findall(grids[0])}
+
+
+def check_page(at, page, column, by, ranges, labels, raw):
+    at.sidebar.radio[0].set_value(page).run()
+    slider = at.slider[0]
+    full = (int(slider.min), int(slider.max))
+    for value in ranges:
+        value = value or full
+        slider.set_value(value).run()
+        assert not at.exception, at.exception
+        expected = raw[raw[by].between(*value)][column].value_counts()
+        tiles = rendered_tiles(at)
+        assert set(tiles) == set(labels), f"{page}: tiles {sorted(tiles)}"
+        for label, key in labels.items():
+            assert tiles[label] == expected.get(key, 0), \
+                f"{page} {by} {value}: {label} shows {tiles[label]}, value_counts() gives {expected.get(key, 0)}"
+
+
+def test_category_tiles(app, raw):
+    categories = {category: category for category in raw['category'].dropna().unique()}
+    assert "Peace" in categories
+    check_page(app, "By Category", 'category', 'year', YEAR_RANGES, categories, raw)
+
+
+def test_gender_tiles(app, raw):
+    check_page(app, "By Age and Gender", 'sex', 'age', AGE_RANGES, GENDER_LABELS, raw)